@@ -0,0 +1,66 @@
+"""
+Сравнение двух файлов результатов benchmarks/run.py.
+
+    python benchmarks/compare.py before.json after.json [--threshold 10]
+
+Печатает медиану, p95 и число запросов по каждому сценарию и помечает
+замедление больше threshold процентов или рост числа запросов.
+Код возврата 1, если есть регрессии, — удобно для CI.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def compare(before, after, threshold):
+    """[(сценарий, до, после, изменение в %, регрессия?)]."""
+    rows = []
+    for name, new in after['results'].items():
+        old = before['results'].get(name)
+        if old is None:
+            rows.append((name, None, new, None, False))
+            continue
+        change = (
+            (new['median_ms'] - old['median_ms']) / old['median_ms'] * 100
+            if old['median_ms'] else 0
+        )
+        regression = (
+            change > threshold
+            or max(new['queries']) > max(old['queries'])
+        )
+        rows.append((name, old, new, change, regression))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10,
+                        help='Допустимое замедление медианы, %%.')
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    print(f"{before['meta']['commit']} → {after['meta']['commit']}, "
+          f"набор {after['meta']['size']}")
+    rows = compare(before, after, args.threshold)
+    for name, old, new, change, regression in rows:
+        if old is None:
+            print(f'  {name:28} новый: {new["median_ms"]:.1f} мс')
+            continue
+        mark = '  РЕГРЕССИЯ' if regression else ''
+        print(
+            f'  {name:28} {old["median_ms"]:8.1f} → {new["median_ms"]:8.1f}'
+            f' мс ({change:+.0f}%), p95 {new["p95_ms"]:.1f} мс,'
+            f' запросов {max(old["queries"])} → {max(new["queries"])}{mark}'
+        )
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Конкурентное чтение и запись: стандартный SQLite-бэкенд против
+blogicum.backends.sqlite3.
+
+    python benchmarks/concurrency.py --size 1k
+    python benchmarks/concurrency.py --readers 16 --writers 4 --duration 20
+
+Читатели в потоках открывают главную страницу, писатели добавляют
+комментарии к горячему посту — как index и add_comment под нагрузкой.
+Каждый режим работает в своём процессе и на своей копии базы из run.py:
+
+* stock — django.db.backends.sqlite3, CONN_MAX_AGE = 0
+  (соединение открывается на каждый запрос), rollback journal;
+* tuned — blogicum.backends.sqlite3 (WAL, PRAGMA, BEGIN IMMEDIATE),
+  постоянные соединения.
+
+Печатает запросы в секунду, p95 и число ошибок (5xx, обычно
+«database is locked»); результаты пишутся в
+benchmarks/results/concurrency-<size>-<commit>.json.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / 'blogicum'), str(ROOT)]
+
+from benchmarks.run import BENCH_DIR, get_commit, log, setup_django  # noqa
+
+MODES = ('stock', 'tuned')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', default='1k',
+                        choices=('1k', '100k', '1m'))
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Длительность замера каждого режима, секунд.')
+    parser.add_argument('--output', default=None,
+                        help='Файл результатов (JSON).')
+    # Внутренний: запуск одного режима в дочернем процессе.
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def copy_database(source, target, journal_mode):
+    """Согласованная копия базы через backup API."""
+    target.unlink(missing_ok=True)
+    for suffix in ('-wal', '-shm'):
+        Path(f'{target}{suffix}').unlink(missing_ok=True)
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+        dst.execute(f'PRAGMA journal_mode = {journal_mode}')
+    dst.close()
+    src.close()
+
+
+def worker(stop, timings, errors, method, url, user=None):
+    from django.test import Client
+
+    client = Client(raise_request_exception=False)
+    if user is not None:
+        client.force_login(user)
+    while not stop.is_set():
+        start = perf_counter()
+        if method == 'post':
+            response = client.post(url, {'text': 'Нагрузочный комментарий'})
+        else:
+            response = client.get(url)
+        if response.status_code >= 500:
+            errors.append(response.status_code)
+        else:
+            timings.append((perf_counter() - start) * 1000)
+
+
+def summarize(timings, errors, duration):
+    timings = sorted(timings)
+    return {
+        'requests_per_s': round(len(timings) / duration, 1),
+        'median_ms': round(statistics.median(timings), 3) if timings else None,
+        'p95_ms': (
+            round(timings[int(len(timings) * 0.95) - 1], 3)
+            if timings else None
+        ),
+        'errors': len(errors),
+    }
+
+
+def run_mode(args):
+    """Замер в текущем процессе; настройки уже выбраны по --mode."""
+    import logging
+
+    import django
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    django.setup()
+    # 500 от «database is locked» считаем, а не печатаем.
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    from django.contrib.auth import get_user_model
+    from django.db import connections
+
+    from benchmarks import datasets
+
+    dataset = datasets.describe()
+    author = get_user_model().objects.get(username=dataset['top_author'])
+    post_id = dataset['hot_post_id']
+    connections.close_all()
+
+    stop = threading.Event()
+    results = {'read': ([], []), 'write': ([], [])}
+    threads = [
+        threading.Thread(target=worker, args=(
+            stop, *results['read'], 'get', '/',
+        ))
+        for _ in range(args.readers)
+    ] + [
+        threading.Thread(target=worker, args=(
+            stop, *results['write'], 'post', f'/posts/{post_id}/comment/',
+            author,
+        ))
+        for _ in range(args.writers)
+    ]
+    for thread in threads:
+        thread.start()
+    stop.wait(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {
+        kind: summarize(timings, errors, args.duration)
+        for kind, (timings, errors) in results.items()
+    }
+
+
+def main():
+    args = parse_args()
+    if args.mode:
+        print(json.dumps(run_mode(args)))
+        return
+
+    database = setup_django(args.size, rebuild=False)
+
+    from django.db import connections
+
+    from benchmarks import datasets
+    from blog.models import Post
+
+    if not Post.objects.exists():
+        n_posts, n_comments = datasets.SIZES[args.size]
+        datasets.seed(n_posts, n_comments, log=log)
+    connections.close_all()
+
+    results = {}
+    for mode in MODES:
+        copy = BENCH_DIR / 'data' / f'concurrency-{mode}.sqlite3'
+        copy_database(
+            database, copy, 'WAL' if mode == 'tuned' else 'DELETE'
+        )
+        log(f'{mode}: {args.readers} читателей, {args.writers} писателей, '
+            f'{args.duration} с')
+        output = subprocess.check_output(
+            [sys.executable, __file__, '--mode', mode,
+             '--readers', str(args.readers), '--writers', str(args.writers),
+             '--duration', str(args.duration)],
+            env={**os.environ, 'BLOGICUM_BENCH_DB': str(copy),
+                 'BLOGICUM_BENCH_BACKEND': mode},
+            text=True,
+        )
+        results[mode] = json.loads(output)
+        for kind, result in results[mode].items():
+            log(f'  {kind}: {result["requests_per_s"]} запр./с, '
+                f'p95 {result["p95_ms"]} мс, ошибок {result["errors"]}')
+
+    commit = get_commit()
+    output = Path(
+        args.output
+        or BENCH_DIR / 'results' / f'concurrency-{args.size}-{commit}.json'
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'meta': {
+            'commit': commit, 'size': args.size, 'readers': args.readers,
+            'writers': args.writers, 'duration': args.duration,
+            'sqlite': sqlite3.sqlite_version,
+        },
+        'results': results,
+    }, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    log(f'Результаты: {output}')
+
+
+if __name__ == '__main__':
+    main()
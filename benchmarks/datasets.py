@@ -0,0 +1,163 @@
+"""
+Синтетические наборы данных фиксированного размера.
+
+Справочники (пользователи, категории, местоположения) создаёт mixer,
+посты и комментарии — bulk_create пачками: миллион постов через
+save() и сигналы заливался бы часами. Генератор случайных чисел
+с фиксированным seed даёт одинаковые данные при каждой заливке.
+
+Один пост («горячий») получает HOT_POST_COMMENTS комментариев —
+для замера post_detail с длинной лентой комментариев.
+"""
+import random
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from blog import search
+from blog.models import Category, Comment, Location, Post
+
+# Размер набора: (постов, комментариев).
+SIZES = {
+    '1k': (1_000, 1_000),
+    '100k': (100_000, 100_000),
+    '1m': (1_000_000, 1_000_000),
+}
+
+N_AUTHORS = 200
+N_CATEGORIES = 20
+N_LOCATIONS = 50
+HOT_POST_COMMENTS = 500
+UNPUBLISHED_SHARE = 0.05
+PUB_DATE_SPAN = timedelta(days=3 * 365)
+# Длина текста поста в словах: (мин., макс.).
+TEXT_WORDS = (20, 300)
+
+WORDS = (
+    'блог пост комета закат город море горы дорога поезд кофе утро '
+    'вечер книга кино музыка друг работа отпуск погода дождь снег '
+    'солнце река лес парк улица окно дом кот собака'
+).split()
+
+
+def make_text(rnd, min_words, max_words):
+    return ' '.join(rnd.choices(WORDS, k=rnd.randint(min_words, max_words)))
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def create_references():
+    """Авторы, категории и местоположения (все опубликованы)."""
+    User = get_user_model()
+    authors = mixer.cycle(N_AUTHORS).blend(
+        User, username=mixer.sequence('bench_author_{0}')
+    )
+    categories = mixer.cycle(N_CATEGORIES).blend(
+        Category,
+        title=mixer.sequence('Категория {0}'),
+        slug=mixer.sequence('bench-category-{0}'),
+        is_published=True,
+    )
+    locations = mixer.cycle(N_LOCATIONS).blend(
+        Location, name=mixer.sequence('Город {0}'), is_published=True
+    )
+    return authors, categories, locations
+
+
+def generate_posts(rnd, n_posts, authors, categories, locations,
+                   text_words=TEXT_WORDS):
+    now = timezone.now()
+    for number in range(n_posts):
+        yield Post(
+            title=f'Пост {number} {make_text(rnd, 1, 4)}'[:256],
+            text=make_text(rnd, *text_words),
+            # Авторы и категории распределены неравномерно: у первых
+            # постов больше, как у активных авторов в жизни.
+            author=authors[min(int(rnd.expovariate(1 / 20)),
+                               len(authors) - 1)],
+            category=categories[min(int(rnd.expovariate(1 / 4)),
+                                    len(categories) - 1)],
+            location=rnd.choice(locations) if rnd.random() < 0.7 else None,
+            is_published=rnd.random() >= UNPUBLISHED_SHARE,
+            pub_date=now - PUB_DATE_SPAN * rnd.random(),
+        )
+
+
+def generate_comments(rnd, n_comments, post_ids, hot_post_id, authors):
+    for number in range(n_comments):
+        post_id = (
+            hot_post_id if number < HOT_POST_COMMENTS
+            else rnd.choice(post_ids)
+        )
+        yield Comment(
+            text=make_text(rnd, 3, 40),
+            post_id=post_id,
+            author=rnd.choice(authors),
+        )
+
+
+def seed(n_posts, n_comments, random_seed=42, batch_size=5000, log=None,
+         text_words=TEXT_WORDS):
+    """Заливает набор в пустую базу и возвращает describe()."""
+    log = log or (lambda message: None)
+    rnd = random.Random(random_seed)
+    with transaction.atomic():
+        authors, categories, locations = create_references()
+        log(f'Справочники: {len(authors)} авторов, '
+            f'{len(categories)} категорий, {len(locations)} мест')
+
+        posts = generate_posts(
+            rnd, n_posts, authors, categories, locations, text_words
+        )
+        for number, batch in enumerate(batched(posts, batch_size), 1):
+            Post.objects.bulk_create(batch, batch_size=batch_size)
+            log(f'Посты: {min(number * batch_size, n_posts)}/{n_posts}')
+
+        post_ids = list(Post.objects.values_list('pk', flat=True))
+        hot_post_id = Post.objects.published().order_by(
+            '-pub_date', '-id'
+        ).values_list('pk', flat=True).first()
+        comments = generate_comments(
+            rnd, n_comments, post_ids, hot_post_id, authors
+        )
+        for number, batch in enumerate(batched(comments, batch_size), 1):
+            Comment.objects.bulk_create(batch, batch_size=batch_size)
+            log(f'Комментарии: {min(number * batch_size, n_comments)}'
+                f'/{n_comments}')
+
+        Post.objects.recount_comments()
+        search.rebuild_index()
+    log('Счётчики комментариев и поисковый индекс пересобраны')
+    return describe()
+
+
+def describe():
+    """Размеры набора и объекты, на которых идут замеры."""
+    published = Post.objects.published()
+    top_author = published.values('author__username').annotate(
+        posts=Count('pk')
+    ).order_by('-posts').first()
+    top_category = published.values('category__slug').annotate(
+        posts=Count('pk')
+    ).order_by('-posts').first()
+    hot_post = published.order_by('-comment_count').values(
+        'pk', 'comment_count'
+    ).first()
+    return {
+        'posts': Post.objects.count(),
+        'published_posts': published.count(),
+        'comments': Comment.objects.count(),
+        'hot_post_id': hot_post and hot_post['pk'],
+        'hot_post_comments': hot_post and hot_post['comment_count'],
+        'top_author': top_author and top_author['author__username'],
+        'top_category': top_category and top_category['category__slug'],
+    }
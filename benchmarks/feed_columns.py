@@ -0,0 +1,142 @@
+"""
+Лента на длинных постах: все колонки против only_card_fields.
+
+    python benchmarks/feed_columns.py
+    python benchmarks/feed_columns.py --posts 20000 --words 5000 --repeat 5
+
+Набор из длинных постов заливается один раз в
+benchmarks/data/feed-columns-<posts>x<words>.sqlite3. Каждый вариант
+QuerySet ленты проходит все опубликованные посты через .iterator();
+считаются строки в секунду (с созданием моделей) и байты, которые
+база отдала в строках результата (сумма размеров значений).
+Результаты пишутся в benchmarks/results/feed-columns-<commit>.json.
+"""
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / 'blogicum'), str(ROOT)]
+
+from benchmarks.run import BENCH_DIR, get_commit, log, setup_django  # noqa
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--words', type=int, default=3000,
+                        help='Средняя длина поста в словах.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Проходов по ленте на вариант.')
+    parser.add_argument('--output', default=None,
+                        help='Файл результатов (JSON).')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Залить набор данных заново.')
+    return parser.parse_args()
+
+
+def get_variants():
+    """{имя: QuerySet} — одна и та же лента с разным набором колонок."""
+    from blog.models import Post
+
+    feed = Post.objects.published().select_related(
+        'author', 'category', 'location'
+    ).order_by('-pub_date', '-id')
+    return {
+        'all_columns': feed,
+        'defer_text': feed.defer('text', 'text_html'),
+        'card_fields': Post.objects.published().for_feed(),
+    }
+
+
+def get_value_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    return len(str(value).encode())
+
+
+def count_bytes(queryset):
+    """(строк, байт) в результате SQL-запроса queryset."""
+    from django.db import connection
+
+    sql, params = queryset.query.sql_with_params()
+    rows = size = 0
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while batch := cursor.fetchmany(2000):
+            rows += len(batch)
+            size += sum(
+                get_value_size(value) for row in batch for value in row
+            )
+    return rows, size
+
+
+def measure(queryset, repeat, chunk_size=2000):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        rows = sum(1 for _ in queryset.iterator(chunk_size=chunk_size))
+        timings.append(perf_counter() - start)
+    _, size = count_bytes(queryset)
+    median = statistics.median(timings)
+    return {
+        'rows': rows,
+        'median_s': round(median, 4),
+        'rows_per_s': round(rows / median) if median else None,
+        'bytes': size,
+        'bytes_per_row': round(size / rows) if rows else 0,
+    }
+
+
+def run(repeat=5, log=None):
+    """Замеряет все варианты и возвращает {имя: результат}."""
+    log = log or (lambda message: None)
+    results = {}
+    for name, queryset in get_variants().items():
+        results[name] = measure(queryset, repeat)
+        log(f'{name}: {results[name]["rows_per_s"]} строк/с, '
+            f'{results[name]["bytes_per_row"]} байт/строку')
+    return results
+
+
+def main():
+    args = parse_args()
+    setup_django(
+        'feed-columns', args.rebuild,
+        database=BENCH_DIR / 'data'
+        / f'feed-columns-{args.posts}x{args.words}.sqlite3',
+    )
+
+    from benchmarks import datasets
+    from blog.models import Post
+
+    if not Post.objects.exists():
+        datasets.seed(
+            args.posts, 0, log=log,
+            text_words=(args.words // 2, args.words * 3 // 2),
+        )
+
+    results = run(args.repeat, log=log)
+
+    commit = get_commit()
+    output = Path(
+        args.output or BENCH_DIR / 'results' / f'feed-columns-{commit}.json'
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'meta': {
+            'commit': commit, 'posts': args.posts, 'words': args.words,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    log(f'Результаты: {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Запуск бенчмарков.
+
+    python benchmarks/run.py --size 1k
+    python benchmarks/run.py --size 100k --repeat 50 --output before.json
+    python benchmarks/compare.py before.json after.json
+
+Набор данных заливается один раз в benchmarks/data/bench-<size>.sqlite3
+и переиспользуется (--rebuild — залить заново). Результаты пишутся
+в JSON (по умолчанию benchmarks/results/<size>-<commit>.json).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCH_DIR = ROOT / 'benchmarks'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', default='1k',
+                        choices=('1k', '100k', '1m'))
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Замеров на сценарий.')
+    parser.add_argument('--only', default='',
+                        help='Сценарии через запятую (по умолчанию все).')
+    parser.add_argument('--output', default=None,
+                        help='Файл результатов (JSON).')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Залить набор данных заново.')
+    return parser.parse_args()
+
+
+def setup_django(size, rebuild, database=None):
+    database = database or BENCH_DIR / 'data' / f'bench-{size}.sqlite3'
+    database.parent.mkdir(exist_ok=True)
+    if rebuild and database.exists():
+        database.unlink()
+    os.environ['BLOGICUM_BENCH_DB'] = str(database)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    sys.path[:0] = [str(ROOT / 'blogicum'), str(ROOT)]
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return database
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def get_meta(args, commit):
+    import django
+    import sqlite3
+
+    from django.utils import timezone
+
+    return {
+        'commit': commit,
+        'size': args.size,
+        'repeat': args.repeat,
+        'time': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'machine': platform.machine(),
+    }
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def main():
+    args = parse_args()
+    setup_django(args.size, args.rebuild)
+
+    from benchmarks import datasets, scenarios
+    from blog.models import Post
+
+    if Post.objects.exists():
+        dataset = datasets.describe()
+    else:
+        n_posts, n_comments = datasets.SIZES[args.size]
+        dataset = datasets.seed(n_posts, n_comments, log=log)
+    log(f'Набор данных: {dataset}')
+
+    only = {name for name in args.only.split(',') if name}
+    results = scenarios.run(dataset, args.repeat, only, log=log)
+
+    commit = get_commit()
+    output = Path(
+        args.output
+        or BENCH_DIR / 'results' / f'{args.size}-{commit}.json'
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'meta': get_meta(args, commit),
+        'dataset': dataset,
+        'results': results,
+    }, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    log(f'Результаты: {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Замеряемые сценарии и сам замер.
+
+Каждый сценарий — GET через django.test.Client (без сети), анонимно.
+Для каждого считаются время (мин., медиана, p95, макс.), число
+SQL-запросов и размер ответа; повтор с другим числом запросов
+или статусом — признак нестабильного сценария, а не шума.
+"""
+import statistics
+from time import perf_counter
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.pagination import Cursor
+
+from api.pagination import PostCursorPagination
+from blog.models import Post
+from blog.paginators import KeysetPaginator
+
+PER_PAGE = 10
+
+
+def get_middle_post(published_posts):
+    """Пост из середины ленты — начало «глубокой» страницы."""
+    return Post.objects.published().order_by('-pub_date', '-id')[
+        published_posts // 2
+    ]
+
+
+def get_api_cursor(post):
+    """Курсор DRF, указывающий на post в /api/v1/posts/."""
+    pagination = PostCursorPagination()
+    pagination.base_url = '/api/v1/posts/'
+    url = pagination.encode_cursor(
+        Cursor(offset=0, reverse=False, position=str(post.pub_date))
+    )
+    return url.split('cursor=', 1)[1]
+
+
+def get_scenarios(dataset):
+    """[(имя, url, настройки)] для набора, описанного datasets.describe."""
+    middle_post = get_middle_post(dataset['published_posts'])
+    deep_page = max(1, dataset['published_posts'] // PER_PAGE // 2)
+    keyset_cursor = KeysetPaginator.encode_cursor(
+        KeysetPaginator.NEXT, middle_post
+    )
+    hot_post_id = dataset['hot_post_id']
+    return [
+        ('index', '/', {}),
+        ('index_deep_offset', f'/?page={deep_page}', {}),
+        (
+            'index_deep_keyset',
+            f'/?cursor={keyset_cursor}',
+            {'BLOG_KEYSET_PAGINATION': True},
+        ),
+        ('category_posts', f'/category/{dataset["top_category"]}/', {}),
+        ('user_posts', f'/profile/{dataset["top_author"]}/', {}),
+        ('post_detail_many_comments', f'/posts/{hot_post_id}/', {}),
+        ('search', '/search/?q=комета закат', {}),
+        ('api_posts_list', '/api/v1/posts/', {}),
+        (
+            'api_posts_deep',
+            f'/api/v1/posts/?cursor={get_api_cursor(middle_post)}',
+            {},
+        ),
+        (
+            'api_posts_by_author',
+            f'/api/v1/posts/?author={dataset["top_author"]}',
+            {},
+        ),
+        ('api_post_detail', f'/api/v1/posts/{hot_post_id}/', {}),
+        (
+            'api_post_comments',
+            f'/api/v1/posts/{hot_post_id}/comments/',
+            {},
+        ),
+    ]
+
+
+def get_percentile(timings, percent):
+    if len(timings) < 2:
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+def measure(client, url, repeat, warmup=1):
+    """Замер одного URL: warmup прогонов без учёта, затем repeat."""
+    for _ in range(warmup):
+        client.get(url)
+    timings = []
+    queries = set()
+    statuses = set()
+    size = 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            start = perf_counter()
+            response = client.get(url)
+            timings.append((perf_counter() - start) * 1000)
+        queries.add(len(captured))
+        statuses.add(response.status_code)
+        size = len(response.content)
+    return {
+        'url': url,
+        'status': sorted(statuses),
+        'repeat': repeat,
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(get_percentile(timings, 95), 3),
+        'max_ms': round(max(timings), 3),
+        'queries': sorted(queries),
+        'response_bytes': size,
+    }
+
+
+def run(dataset, repeat=20, only=None, log=None):
+    """Прогоняет сценарии и возвращает {имя: результат}."""
+    log = log or (lambda message: None)
+    client = Client()
+    results = {}
+    for name, url, extra_settings in get_scenarios(dataset):
+        if only and name not in only:
+            continue
+        with override_settings(**extra_settings):
+            results[name] = measure(client, url, repeat)
+        log(f'{name}: медиана {results[name]["median_ms"]} мс, '
+            f'запросов {results[name]["queries"]}')
+    return results
@@ -0,0 +1,50 @@
+"""
+Настройки Django для бенчмарков.
+
+Всё как в blogicum.settings, кроме:
+
+* отдельной базы (BLOGICUM_BENCH_DB), чтобы не трогать db.sqlite3;
+* BLOGICUM_BENCH_BACKEND=stock — стандартный SQLite-бэкенд без
+  постоянных соединений, для сравнения в concurrency.py;
+* DummyCache — меряем работу views, а не попадания в кеш страниц
+  (кеш карточек постов оставлен: это часть рендеринга);
+* выключенных мониторинга и профайлера;
+* DEBUG = False, как в продакшене.
+"""
+import os
+
+from blogicum.settings import *  # noqa: F401,F403
+from blogicum.settings import BASE_DIR, CACHES, MIDDLEWARE
+
+DEBUG = False
+ALLOWED_HOSTS = ['testserver']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'blogicum.backends.sqlite3',
+        'NAME': os.environ.get(
+            'BLOGICUM_BENCH_DB',
+            BASE_DIR.parent / 'benchmarks' / 'data' / 'bench.sqlite3',
+        ),
+        'CONN_MAX_AGE': 600,
+    }
+}
+if os.environ.get('BLOGICUM_BENCH_BACKEND') == 'stock':
+    DATABASES['default'].update(
+        ENGINE='django.db.backends.sqlite3', CONN_MAX_AGE=0
+    )
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'template_fragments': CACHES['template_fragments'],
+}
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if not middleware.startswith('monitoring.')
+]
+MONITORING_ENABLED = False
+MONITORING_SLOW_QUERY_MS = None
+MONITORING_PROFILE_VIEWS = []
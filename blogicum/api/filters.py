@@ -0,0 +1,28 @@
+import django_filters
+
+from blog.models import Post
+from blog.search import get_ranked_post_ids
+
+
+class PostFilter(django_filters.FilterSet):
+    """
+    Фильтры ленты API: ?author=, ?category=, ?location=, ?pub_date_*
+    и полнотекстовый ?search= (только опубликованные посты, как в ленте).
+
+    Порядок bm25 фильтр сохранить не может: id в порядке ранга
+    остаются в request.search_ranked_ids для PostSearchPagination.
+    """
+
+    author = django_filters.CharFilter(field_name='author__username')
+    pub_date = django_filters.IsoDateTimeFromToRangeFilter()
+    search = django_filters.CharFilter(method='filter_search')
+
+    class Meta:
+        model = Post
+        fields = ('author', 'category', 'location', 'pub_date')
+
+    def filter_search(self, queryset, name, value):
+        ranked_ids = get_ranked_post_ids(value)
+        if self.request is not None:
+            self.request.search_ranked_ids = ranked_ids
+        return queryset.filter(pk__in=ranked_ids)
@@ -0,0 +1,61 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class PostCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация постов по (pub_date, id).
+
+    Не делает COUNT(*) и OFFSET по всей таблице, поэтому время ответа
+    не растёт вместе с числом постов.
+    """
+
+    ordering = ('-pub_date', '-id')
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PostSearchPagination(PageNumberPagination):
+    """
+    Пагинация поиска (?search=) по номерам страниц в порядке bm25.
+
+    Курсор по (pub_date, id) потерял бы ранг, а выдача поиска
+    и так ограничена BLOG_SEARCH_MAX_RESULTS, поэтому нумеруется
+    список id, а посты загружаются только для текущей страницы.
+    """
+
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ranked_ids = getattr(request, 'search_ranked_ids', None)
+        if ranked_ids is None:
+            # Пустой ?search= фильтр пропускает.
+            return super().paginate_queryset(
+                queryset.order_by(*PostCursorPagination.ordering),
+                request, view,
+            )
+        # Остальные фильтры (автор, категория, ...) уже в queryset.
+        matched = set(queryset.values_list('pk', flat=True))
+        page_ids = super().paginate_queryset(
+            [pk for pk in ranked_ids if pk in matched], request, view
+        )
+        if page_ids is None:
+            return None
+        posts = queryset.in_bulk(page_ids)
+        return [posts[pk] for pk in page_ids if pk in posts]
+
+
+class CommentCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация комментариев по (created_at, id).
+
+    Даже у поста с десятками тысяч комментариев ответ ограничен
+    одной страницей.
+    """
+
+    ordering = ('created_at', 'id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -2,6 +2,7 @@ from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
 from blog.models import Post, Comment
+from blog.uploads import LimitedImageField
 
 User = get_user_model()
 
@@ -11,6 +12,12 @@ class PostSerializer(serializers.ModelSerializer):
         read_only=True,
         slug_field='username',
     )
+    image = serializers.ImageField(
+        required=False,
+        allow_null=True,
+        _DjangoImageField=LimitedImageField,
+    )
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
@@ -21,11 +28,23 @@ class PostSerializer(serializers.ModelSerializer):
             'text',
             'pub_date',
             'image',
+            'srcset',
             'category',
             'location',
             'is_published',
         )
 
+    def get_srcset(self, post):
+        """Уменьшенные копии изображения: {"webp": "...", "jpeg": "..."}."""
+        if not post.get_ready_variants():
+            return None
+        request = self.context.get('request')
+        absolute_url = request.build_absolute_uri if request else None
+        return {
+            image_format: post.get_image_srcset(image_format, absolute_url)
+            for image_format in ('webp', 'jpeg')
+        }
+
 
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
@@ -1,33 +1,198 @@
-from rest_framework import viewsets
-from rest_framework.generics import get_object_or_404
+from django.core.paginator import Page
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import status, viewsets
+from rest_framework.exceptions import APIException
 
+from blog import cache
+from blog.conditional import get_post_etag, get_user_part, make_etag
 from blog.models import Post, Comment
+from blog.uploads import ImageUploadLimitHandler, get_upload_error
+from blogicum.replicas import use_replicas
+from .filters import PostFilter
+from .pagination import (
+    CommentCursorPagination, PostCursorPagination, PostSearchPagination
+)
 from .serializers import PostSerializer, CommentSerializer
 from .permissions import IsAuthorOrReadOnly
 
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.select_related('author').all()
+class RequestEntityTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Слишком большой запрос.'
+    default_code = 'upload_limit'
+
+
+class ReplicaReadMixin:
+    """GET и HEAD читают с реплики (см. blogicum.replicas)."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with use_replicas(request):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    ETag для list/retrieve.
+
+    ETag считается по уже выбранной странице (id и updated_at строк)
+    или по одной строке объекта — до сериализации. Совпадающий
+    If-None-Match получает 304 без тела.
+
+    Last-Modified не отдаётся, как и на HTML-страницах
+    (blog.conditional): max(updated_at) не сдвигается при удалении
+    строки со страницы или смене имени автора.
+    """
+
+    def get_page_etag_parts(self, page):
+        """Части ETag для страницы списка."""
+        return [obj.pk for obj in page]
+
+    def get_object_etag_parts(self):
+        """Части ETag для одного объекта; None — без ETag."""
+        return None
+
+    def conditional_response(self, etag_parts, build_response):
+        if etag_parts is None:
+            return build_response()
+        etag = make_etag(
+            *etag_parts,
+            self.request.META.get('QUERY_STRING', ''),
+            get_user_part(self.request),
+        )
+        response = get_conditional_response(self.request, etag=etag)
+        if response is None:
+            response = build_response()
+        response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return super().list(request, *args, **kwargs)
+        paginator = self.paginator
+        etag_parts = [
+            *self.get_page_etag_parts(page),
+            getattr(paginator, 'has_next', None),
+            getattr(paginator, 'has_previous', None),
+        ]
+        if isinstance(getattr(paginator, 'page', None), Page):
+            # Пагинация по номерам: число результатов есть в ответе.
+            etag_parts.append(paginator.page.paginator.count)
+        return self.conditional_response(
+            etag_parts,
+            lambda: self.get_paginated_response(
+                self.get_serializer(page, many=True).data
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_object_etag_parts(),
+            lambda: super(ConditionalGetMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
+
+
+class PostViewSet(
+    ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
+    queryset = Post.objects.select_related(
+        'author', 'category', 'location'
+    ).all()
     serializer_class = PostSerializer
     permission_classes = (IsAuthorOrReadOnly,)
+    pagination_class = PostCursorPagination
+    search_pagination_class = PostSearchPagination
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = PostFilter
+
+    @property
+    def paginator(self):
+        # Выдача поиска идёт в порядке bm25, а не по курсору.
+        if not hasattr(self, '_paginator') and self.request.query_params.get(
+            'search'
+        ):
+            self._paginator = self.search_pagination_class()
+        return super().paginator
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Лимиты изображений — только для загрузок постов
+        # (см. blog.uploads); обработчик нужен до разбора тела.
+        request.upload_handlers.insert(0, ImageUploadLimitHandler(request))
+        return super().initialize_request(request, *args, **kwargs)
+
+    def get_serializer(self, *args, **kwargs):
+        error = get_upload_error(self.request)
+        if error:
+            raise RequestEntityTooLarge(error)
+        return super().get_serializer(*args, **kwargs)
+
+    # Сериализатор выводит имя автора: его смена меняет версию
+    # GLOBAL_SCOPE (blog.signals), а не updated_at поста.
+
+    def get_page_etag_parts(self, page):
+        return [
+            'api-posts',
+            *[post.pk for post in page],
+            *[post.updated_at for post in page],
+            *cache.get_versions([cache.GLOBAL_SCOPE]),
+        ]
+
+    def get_object_etag_parts(self):
+        updated_at = Post.objects.filter(
+            pk=self.kwargs.get('pk')
+        ).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise Http404('Пост не найден')
+        return [
+            'api-post', updated_at,
+            *cache.get_versions([cache.GLOBAL_SCOPE]),
+        ]
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorOrReadOnly,)
+    pagination_class = CommentCursorPagination
+
+    def get_post_id(self):
+        """
+        Возвращает id поста из URL; 404, если поста нет.
+
+        Проверка делается через EXISTS без загрузки строки поста
+        и выполняется один раз за запрос.
+        """
+        if not hasattr(self, '_post_id'):
+            post_id = self.kwargs.get('post_id')
+            if not Post.objects.filter(pk=post_id).exists():
+                raise Http404('Пост не найден')
+            self._post_id = int(post_id)
+        return self._post_id
 
-    def get_post(self):
-        return get_object_or_404(Post, pk=self.kwargs.get('post_id'))
+    def get_page_etag_parts(self, page):
+        """
+        Post.updated_at меняется при любых изменениях комментариев
+        поста, поэтому ETag строится из строки поста.
+        """
+        etag = get_post_etag(self.request, self.get_post_id())
+        return ['api-comments', etag, *[c.pk for c in page]]
 
     def get_queryset(self):
-        post = self.get_post()
-        return post.comments.select_related('author').all()
+        return Comment.objects.filter(
+            post_id=self.get_post_id()
+        ).select_related('author')
 
     def perform_create(self, serializer):
         serializer.save(
             author=self.request.user,
-            post=self.get_post(),
+            post_id=self.get_post_id(),
         )
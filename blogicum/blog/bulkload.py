@@ -0,0 +1,269 @@
+"""
+Быстрая загрузка фикстур в формате dumpdata (JSON или NDJSON).
+
+В отличие от loaddata, который сохраняет объекты по одному через
+save() с сигналами, здесь:
+
+* файл читается потоково: JSONDecoder.raw_decode по буферу,
+  который дочитывается кусками, — весь файл в память не попадает,
+  а буфер одного объекта ограничен MAX_OBJECT_SIZE;
+* объекты копятся по моделям и пишутся пачками через bulk_create
+  (сигналы не срабатывают); строки, чей pk уже есть в базе,
+  обновляются bulk_update — как это делает loaddata;
+* auto_now / auto_now_add на время загрузки выключены, чтобы
+  не затереть даты из фикстуры;
+* всё идёт в одной транзакции с отложенной проверкой внешних ключей,
+  поэтому порядок моделей в файле не важен;
+* в конце пересчитываются производные данные, которые обычно
+  поддерживают сигналы: Post.comment_count и поисковый индекс.
+"""
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.apps import apps
+from django.core.management.base import CommandError
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import DateField
+from django.utils import timezone
+
+from . import cache, search
+from .models import Post
+
+READ_SIZE = 1024 * 1024
+MAX_OBJECT_SIZE = 64 * 1024 * 1024
+SEPARATORS = ' \t\r\n,[]'
+
+
+def get_byte_length(text):
+    return len(text.encode('utf-8'))
+
+
+def iter_json_objects(stream, read_size=READ_SIZE,
+                      max_object_size=MAX_OBJECT_SIZE):
+    """
+    Объекты из JSON-массива, NDJSON или просто идущих подряд объектов.
+
+    Разделители между объектами (пробелы, запятые, скобки массива)
+    пропускаются, каждый объект разбирается raw_decode; если объект
+    не поместился в буфер, дочитываем ещё. Объект длиннее
+    max_object_size символов считается повреждённым: CommandError
+    с байтовым смещением его начала, а не чтение файла до конца.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    # Сколько байт файла было до начала buffer.
+    offset = 0
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in SEPARATORS:
+            position += 1
+        if position == len(buffer):
+            if eof:
+                return
+            offset += get_byte_length(buffer)
+            buffer, position = stream.read(read_size), 0
+            eof = not buffer
+            continue
+        try:
+            obj, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as error:
+            start = offset + get_byte_length(buffer[:position])
+            if eof:
+                raise CommandError(
+                    f'Некорректный JSON в объекте с байта {start}: '
+                    f'{error.msg}'
+                )
+            if len(buffer) - position > max_object_size:
+                raise CommandError(
+                    f'Объект с байта {start} не разобран в пределах '
+                    f'{max_object_size} символов: {error.msg}'
+                )
+            chunk = stream.read(read_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            offset, position = start, 0
+            # Большой объект: читаем сразу больше, чтобы не разбирать
+            # его начало снова и снова.
+            read_size = min(read_size * 2, max_object_size)
+            continue
+        yield obj
+        position = end
+
+
+def chunked(items, size=search.MAX_QUERY_PARAMS):
+    """Части списка для IN (...): у SQLite лимит параметров запроса."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def get_auto_date_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, DateField)
+        and (field.auto_now or field.auto_now_add)
+    ]
+
+
+@contextmanager
+def auto_dates_disabled(models):
+    """
+    Выключает auto_now / auto_now_add у полей models.
+
+    Отдаёт {модель: выключенные поля} — после выключения их уже
+    не найти по флагам.
+    """
+    fields = {model: get_auto_date_fields(model) for model in models}
+    saved = []
+    for model_fields in fields.values():
+        for field in model_fields:
+            saved.append((field, field.auto_now, field.auto_now_add))
+            field.auto_now = field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BulkLoader:
+    """Копит объекты по моделям и пишет их пачками."""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, batch_size=2000,
+                 auto_date_fields=None):
+        self.using = using
+        self.auto_date_fields = auto_date_fields or {}
+        self.batch_size = batch_size
+        self.pending = defaultdict(list)
+        self.pending_m2m = defaultdict(list)
+        self.counts = defaultdict(int)
+        self.now = timezone.now()
+
+    def add(self, deserialized):
+        obj = deserialized.object
+        model = type(obj)
+        self.pending[model].append(obj)
+        for name, values in (deserialized.m2m_data or {}).items():
+            self.pending_m2m[(model, name)].append((obj.pk, values))
+        if len(self.pending[model]) >= self.batch_size:
+            self.flush_model(model)
+
+    def fill_missing_dates(self, model, objs):
+        # В фикстуре может не быть полей, которые раньше заполнял
+        # auto_now(_add), — ставим момент начала загрузки.
+        for field in self.auto_date_fields.get(model, ()):
+            for obj in objs:
+                if getattr(obj, field.attname) is None:
+                    setattr(obj, field.attname, self.now)
+
+    def flush_model(self, model):
+        objs = self.pending.pop(model, [])
+        if not objs:
+            return
+        self.fill_missing_dates(model, objs)
+        manager = model._base_manager.db_manager(self.using)
+        existing = set()
+        for pks in chunked([obj.pk for obj in objs if obj.pk is not None]):
+            existing.update(
+                manager.filter(pk__in=pks).values_list('pk', flat=True)
+            )
+        to_update = [obj for obj in objs if obj.pk in existing]
+        to_create = [obj for obj in objs if obj.pk not in existing]
+        if to_create:
+            manager.bulk_create(to_create, batch_size=self.batch_size)
+        if to_update:
+            # bulk_update, в отличие от bulk_create, не зовёт pre_save:
+            # без этого не пересчитались бы производные поля
+            # (blog.fields) у обновляемых строк.
+            for obj in to_update:
+                for field in model._meta.concrete_fields:
+                    field.pre_save(obj, add=False)
+            manager.bulk_update(
+                to_update,
+                [
+                    field.name for field in model._meta.concrete_fields
+                    if not field.primary_key
+                ],
+                batch_size=self.batch_size,
+            )
+        self.counts[model._meta.label] += len(objs)
+        self.flush_m2m(model)
+
+    def flush_m2m(self, model):
+        for (m2m_model, name), rows in list(self.pending_m2m.items()):
+            if m2m_model is not model:
+                continue
+            del self.pending_m2m[(m2m_model, name)]
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            manager = through._base_manager.db_manager(self.using)
+            for pks in chunked([pk for pk, _ in rows]):
+                manager.filter(**{f'{source}__in': pks}).delete()
+            manager.bulk_create(
+                [
+                    through(**{source: pk, target: value})
+                    for pk, values in rows
+                    for value in values
+                ],
+                batch_size=self.batch_size,
+            )
+
+    def flush(self):
+        for model in list(self.pending):
+            self.flush_model(model)
+
+    def reset_sequences(self):
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), self.loaded_models
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    @property
+    def loaded_models(self):
+        return [apps.get_model(label) for label in self.counts]
+
+
+def rebuild_derived_data():
+    """То, что при обычном save() поддерживают сигналы blog.signals."""
+    Post.objects.recount_comments()
+    search.rebuild_index()
+    cache.invalidate(cache.GLOBAL_SCOPE)
+
+
+def load(stream, using=DEFAULT_DB_ALIAS, batch_size=2000,
+         ignorenonexistent=False):
+    """
+    Загружает фикстуру из текстового потока stream.
+
+    Возвращает (счётчики по моделям, время в секундах).
+    """
+    start = perf_counter()
+    connection = connections[using]
+    objects = Deserializer(
+        iter_json_objects(stream),
+        using=using,
+        ignorenonexistent=ignorenonexistent,
+    )
+    with transaction.atomic(using=using):
+        with connection.constraint_checks_disabled(), \
+                auto_dates_disabled(apps.get_models()) as auto_date_fields:
+            loader = BulkLoader(using, batch_size, auto_date_fields)
+            for deserialized in objects:
+                loader.add(deserialized)
+            loader.flush()
+        connection.check_constraints(table_names=[
+            model._meta.db_table for model in loader.loaded_models
+        ])
+        loader.reset_sequences()
+        rebuild_derived_data()
+    return dict(loader.counts), perf_counter() - start
@@ -0,0 +1,174 @@
+"""
+Кеш страниц для анонимных посетителей.
+
+Ключ страницы строится из пути, номера страницы (или курсора)
+и версий «областей», от которых страница зависит:
+
+* ``feed`` — ленты (главная и категории): меняется при любом
+  изменении постов;
+* ``post:<id>`` — страница одного поста и его карточка в лентах:
+  меняется и при изменении комментариев;
+* ``comments`` — любые изменения комментариев; в ключ страницы
+  не входит, нужна только ETag лент (blog.conditional);
+* ``global`` — всё сразу: категории, местоположения и имена авторов
+  выводятся и в карточках, и на страницах постов.
+
+Какие посты попали на страницу ленты, известно только после выборки,
+поэтому их области view сообщает через depends_on(): версии этих
+областей хранятся рядом с ответом и сверяются при чтении. Так
+комментарий сбрасывает только страницы, где видна карточка его поста.
+
+Сигналы (blog.signals) не удаляют записи, а меняют версию области —
+старые ключи просто перестают запрашиваться и вытесняются по TTL.
+"""
+import hashlib
+from datetime import timedelta
+from functools import wraps
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from blogicum.replicas import use_primary
+
+GLOBAL_SCOPE = 'global'
+FEED_SCOPE = 'feed'
+COMMENTS_SCOPE = 'comments'
+
+VERSION_KEY = 'blog:pagecache:version:{}'
+PAGE_KEY = 'blog:pagecache:page:{}'
+PAGE_PARAMS = ('page', 'cursor')
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def get_timeout():
+    return getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 300)
+
+
+def invalidate(*scopes):
+    """Сбрасывает кеш всех страниц, зависящих от scopes."""
+    cache.set_many(
+        {VERSION_KEY.format(scope): uuid4().hex for scope in scopes},
+        timeout=None,
+    )
+
+
+def get_versions(scopes):
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def get_page_key(request, scopes):
+    parts = [request.path]
+    parts += [
+        f'{name}={request.GET.get(name, "")}' for name in PAGE_PARAMS
+    ]
+    parts += get_versions((GLOBAL_SCOPE, *scopes))
+    digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return PAGE_KEY.format(digest)
+
+
+def depends_on(request, scopes):
+    """
+    Страница запроса зависит ещё и от scopes.
+
+    Версии читаются сразу, до рендеринга: если область изменится
+    позже, закешированный ответ при чтении окажется устаревшим.
+    Страницы вошедших пользователей не кешируются — для них ничего.
+    """
+    if request.user.is_authenticated:
+        return
+    scopes = list(scopes)
+    versions = getattr(request, '_page_cache_versions', {})
+    versions.update(zip(scopes, get_versions(scopes)))
+    request._page_cache_versions = versions
+
+
+def is_fresh(versions):
+    """Не менялись ли области из depends_on с момента кеширования."""
+    scopes = list(versions)
+    return get_versions(scopes) == [versions[scope] for scope in scopes]
+
+
+def seconds_until_next_publication():
+    """
+    Сколько секунд осталось до ближайшей отложенной публикации.
+
+    Страница, закешированная сейчас, должна протухнуть ровно
+    в момент, когда в ленте появится запланированный пост.
+    """
+    from .models import Post
+
+    now = timezone.now()
+    next_pub_date = Post.objects.filter(
+        is_published=True,
+        pub_date__gt=now,
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+    if next_pub_date is None:
+        return None
+    return max(1, int((next_pub_date - now) / timedelta(seconds=1)) + 1)
+
+
+def has_messages(request):
+    """Есть ли у посетителя сообщения, которые покажет страница."""
+    return 'messages' in request.COOKIES
+
+
+def get_page_timeout():
+    """TTL страницы: не дольше, чем до ближайшей отложенной публикации."""
+    timeout = get_timeout()
+    until_publication = seconds_until_next_publication()
+    if until_publication is not None:
+        timeout = min(timeout, until_publication)
+    return timeout
+
+
+def is_cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.cookies
+        and not has_messages(request)
+    )
+
+
+def anonymous_page_cache(get_scopes):
+    """
+    Декоратор view: кеширует ответ на анонимный GET.
+
+    get_scopes(**kwargs) получает аргументы view и возвращает
+    области кеша, от которых зависит страница.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            key = get_page_key(request, get_scopes(**kwargs))
+            cached = cache.get(key)
+            if cached is not None:
+                response, versions = cached
+                if is_fresh(versions):
+                    return response
+
+            # Сигналы уже сменили версии, а реплика могла ещё не
+            # догнать default: её ответ провисел бы в кеше весь TTL.
+            with use_primary():
+                response = view(request, *args, **kwargs)
+                if is_cacheable(request, response):
+                    cache.set(key, (
+                        response,
+                        getattr(request, '_page_cache_versions', {}),
+                    ), get_page_timeout())
+            return response
+        return wrapper
+    return decorator
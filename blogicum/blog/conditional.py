@@ -0,0 +1,146 @@
+"""
+Условные GET-запросы (ETag) для лент и страниц постов.
+
+Валидатор считается до рендеринга шаблона из дешёвых источников:
+версий областей кеша (blog.cache), которые меняют сигналы, и одной
+строки из индекса. Если клиент прислал совпадающий If-None-Match,
+django.views.decorators.http.condition сразу отвечает 304.
+
+В ETag ленты входят:
+
+* версии областей blog.cache GLOBAL_SCOPE, FEED_SCOPE и COMMENTS_SCOPE —
+  меняются при любых изменениях постов (в том числе удалении),
+  комментариев, категорий, местоположений и имён авторов;
+* дата публикации самого свежего видимого поста — отложенный пост
+  появляется в ленте без всяких сигналов;
+* номер страницы или курсор.
+
+ETag профиля дополнительно включает поля пользователя, которые
+выводит profile.html (PROFILE_FIELDS): их правка не трогает
+ни посты, ни версии областей кеша.
+
+Last-Modified не отдаётся ни лентам, ни странице поста: дата
+последнего изменения видимых постов не сдвигается при удалении поста
+или снятии категории с публикации, а Post.updated_at — при смене
+имени автора, названия категории или местоположения (это версия
+GLOBAL_SCOPE, у неё нет даты). Клиент с одним If-Modified-Since
+получил бы 304 с устаревшей страницей.
+
+Валидаторы получают только анонимные посетители без отложенных
+сообщений — как и кеш страниц (blog.cache.is_cacheable): у вошедшего
+пользователя в странице CSRF-токен и сообщения, которые 304 бы потерял.
+"""
+import hashlib
+
+from django.db.models import Subquery
+from django.views.decorators.http import condition
+
+from . import cache
+from .models import Post, User
+
+PROFILE_FIELDS = ('first_name', 'last_name', 'is_staff', 'date_joined')
+
+
+def make_etag(*parts):
+    digest = hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def get_user_part(request):
+    user = request.user
+    return user.pk if user.is_authenticated else 'anonymous'
+
+
+def make_feed_etag(request, latest_pub_date, *parts):
+    return make_etag(
+        'feed',
+        latest_pub_date,
+        request.GET.get('page', ''),
+        request.GET.get('cursor', ''),
+        *cache.get_versions([
+            cache.GLOBAL_SCOPE, cache.FEED_SCOPE, cache.COMMENTS_SCOPE
+        ]),
+        *parts,
+    )
+
+
+def get_feed_etag(request, posts):
+    """Значение ETag для страницы ленты posts."""
+    latest_pub_date = posts.order_by('-pub_date').values_list(
+        'pub_date', flat=True
+    ).first()
+    return make_feed_etag(request, latest_pub_date)
+
+
+def get_profile_etag(request, username, posts):
+    """
+    Значение ETag для страницы профиля username с его постами posts.
+
+    Поля пользователя и дата свежего поста — одним запросом.
+    """
+    profile = User.objects.filter(username=username).annotate(
+        latest_pub_date=Subquery(
+            posts.order_by('-pub_date').values('pub_date')[:1]
+        )
+    ).values_list('latest_pub_date', *PROFILE_FIELDS).first()
+    if profile is None:
+        return None
+    latest_pub_date, *fields = profile
+    return make_feed_etag(request, latest_pub_date, 'profile', *fields)
+
+
+def get_post_etag(request, post_id):
+    """Значение ETag для страницы поста с комментариями."""
+    post = Post.objects.filter(pk=post_id).values(
+        'updated_at', 'comment_count'
+    ).first()
+    if post is None:
+        return None
+    return make_etag(
+        'post',
+        post_id,
+        post['updated_at'],
+        post['comment_count'],
+        get_user_part(request),
+        *cache.get_versions([cache.GLOBAL_SCOPE]),
+    )
+
+
+def conditional_view(get_etag):
+    """
+    Декоратор: condition() с ETag для анонимных посетителей.
+
+    get_etag(request, **kwargs) возвращает ETag или None.
+    """
+    def etag_func(request, *args, **kwargs):
+        if request.user.is_authenticated or cache.has_messages(request):
+            return None
+        return get_etag(request, **kwargs)
+
+    return condition(etag_func=etag_func)
+
+
+def feed_condition(get_posts):
+    """conditional_view для ленты; get_posts(request, **kwargs) → QuerySet."""
+    return conditional_view(
+        lambda request, **kwargs: get_feed_etag(
+            request, get_posts(request, **kwargs)
+        )
+    )
+
+
+def profile_condition(get_posts):
+    """
+    conditional_view для профиля: лента get_posts(request, username)
+    и поля самого пользователя.
+    """
+    return conditional_view(
+        lambda request, username: get_profile_etag(
+            request, username, get_posts(request, username)
+        )
+    )
+
+
+post_condition = conditional_view(
+    lambda request, id: get_post_etag(request, id)
+)
@@ -0,0 +1,110 @@
+"""
+Потоковая выгрузка постов и комментариев в NDJSON или CSV.
+
+Строки читаются пачками по первичному ключу (keyset: pk > последний),
+внутри пачки — через .iterator(), поэтому в памяти одновременно
+не больше batch_size строк, сколько бы их ни было в таблице.
+Вывод — генератор байтовых кусков: его можно отдать
+в StreamingHttpResponse или записать в файл.
+"""
+import csv
+import io
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Post
+
+FORMATS = ('ndjson', 'csv')
+CHUNK_SIZE = 64 * 1024
+
+# Набор: (модель, выгружаемые поля). Автор — и id, и username,
+# чтобы выгрузку можно было читать без таблицы пользователей.
+EXPORTS = {
+    'posts': (Post, (
+        'id', 'title', 'text', 'pub_date', 'created_at', 'updated_at',
+        'is_published', 'author_id', 'author__username', 'category_id',
+        'location_id', 'comment_count', 'image',
+    )),
+    'comments': (Comment, (
+        'id', 'post_id', 'author_id', 'author__username', 'text',
+        'created_at', 'is_published',
+    )),
+}
+
+
+def iter_rows(model, fields, batch_size=2000):
+    """Кортежи значений fields по всем строкам model в порядке pk."""
+    queryset = model._base_manager.order_by('pk').values_list(*fields)
+    last_pk = 0
+    while True:
+        count = 0
+        for row in queryset.filter(pk__gt=last_pk)[:batch_size].iterator(
+            chunk_size=batch_size
+        ):
+            count += 1
+            yield row
+        if count < batch_size:
+            return
+        # id всегда первое поле выгрузки.
+        last_pk = row[0]
+
+
+def iter_ndjson(fields, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+def iter_csv(fields, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Заголовок остаётся в буфере, если строк нет.
+    yield buffer.getvalue()
+
+
+def iter_chunks(lines, chunk_size=CHUNK_SIZE):
+    """Склеивает строки в куски байтов около chunk_size."""
+    parts = []
+    size = 0
+    for line in lines:
+        data = line.encode()
+        parts.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b''.join(parts)
+            parts, size = [], 0
+    if parts:
+        yield b''.join(parts)
+
+
+def iter_gzip(chunks):
+    # wbits=31 — формат gzip (заголовок и CRC), а не «голый» zlib.
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(kind, export_format='ndjson', compress=False, batch_size=2000):
+    """Генератор байтов выгрузки набора kind из EXPORTS."""
+    model, fields = EXPORTS[kind]
+    rows = iter_rows(model, fields, batch_size)
+    if export_format == 'csv':
+        lines = iter_csv(fields, rows)
+    else:
+        lines = iter_ndjson(fields, rows)
+    chunks = iter_chunks(lines)
+    return iter_gzip(chunks) if compress else chunks
+
+
+def get_filename(kind, export_format, compress=False):
+    return f'{kind}.{export_format}' + ('.gz' if compress else '')
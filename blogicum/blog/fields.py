@@ -0,0 +1,100 @@
+"""
+Поля, которые хранят значение, вычисленное из другого поля модели.
+
+Значение пересчитывается в pre_save — при save() и bulk_create(),
+как auto_now у дат, — поэтому шаблонам не нужно каждый раз прогонять
+через фильтры полный текст, а лентам — вообще его загружать.
+
+save(update_fields=[...]) с исходным полем дописывает производные
+(DerivedFieldsModelMixin). QuerySet.update() и bulk_update() pre_save
+не вызывают: исходное поле через них менять нельзя, иначе производные
+разойдутся с ним (bulk_update — только после ручного pre_save, как
+в blog.bulkload).
+"""
+from django.db import models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 10
+
+
+def render_text(text):
+    """HTML текста поста или комментария: как |linebreaksbr в шаблоне."""
+    return linebreaksbr(text, autoescape=True)
+
+
+def make_excerpt(text):
+    """Начало текста для карточки: как |truncatewords:10 в шаблоне."""
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+class DerivedFieldMixin:
+    """
+    source — имя исходного поля, render — функция от его значения.
+
+    Поле не редактируется в формах: оно всегда следует за source.
+    """
+
+    def __init__(self, *args, source, render, **kwargs):
+        self.source = source
+        self.render = render
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        kwargs['render'] = self.render
+        # Умолчания поля другие, чем у Field: пишем только отличия.
+        kwargs.pop('editable', None)
+        kwargs.pop('blank', None)
+        if self.editable:
+            kwargs['editable'] = True
+        if not self.blank:
+            kwargs['blank'] = False
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = self.render(getattr(model_instance, self.source) or '')
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class DerivedTextField(DerivedFieldMixin, models.TextField):
+    pass
+
+
+class DerivedCharField(DerivedFieldMixin, models.CharField):
+
+    def pre_save(self, model_instance, add):
+        value = super().pre_save(model_instance, add)[:self.max_length]
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+def get_derived_fields(model, field_names):
+    """Имена производных полей model, чьё исходное поле в field_names."""
+    return [
+        field.name for field in model._meta.concrete_fields
+        if isinstance(field, DerivedFieldMixin)
+        and field.source in field_names
+    ]
+
+
+class DerivedFieldsModelMixin:
+    """
+    save(update_fields=...) сохраняет и производные поля.
+
+    Иначе pre_save пересчитал бы их только в объекте, а в базу ушло бы
+    одно исходное поле.
+    """
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields,
+                *get_derived_fields(type(self), update_fields),
+            }
+        super().save(*args, **kwargs)
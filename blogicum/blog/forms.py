@@ -2,6 +2,7 @@ from django import forms
 from .models import Post, Category, Location
 from django.utils import timezone
 from .models import Comment
+from .uploads import LimitedImageField
 
 
 class PostForm(forms.ModelForm):
@@ -16,6 +17,7 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ['author', 'created_at']
+        field_classes = {'image': LimitedImageField}
         widgets = {
             'title': forms.TextInput(attrs={'class': 'form-control'}),
             'text': forms.Textarea(attrs={'class': 'form-control', 'rows': 5}),
@@ -0,0 +1,253 @@
+"""
+Уменьшенные копии изображений постов для srcset.
+
+Views сохраняют только оригинал. Воркер manage.py
+generate_image_variants находит посты с пустым Post.image_variants
+и кладёт рядом с оригиналом копии шириной BLOG_IMAGE_WIDTHS
+в WebP и JPEG. Копии сохраняются в то же хранилище, что и оригинал
+(blog.storage), то есть тоже под именами-хешами.
+
+В Post.image_variants записывается, для какого файла они сделаны:
+
+    {"source": "post_images/3f/a1/3fa1….jpg", "width": 2000,
+     "height": 1500,
+     "webp": {"320": "post_images/9c/04/9c04….webp", ...},
+     "jpeg": {"320": "post_images/e2/7b/e27b….jpg", ...}}
+
+Если тот же файл уже обработан для другого поста, его копии
+переиспользуются без повторного кодирования.
+Пока копий нет, шаблоны и API отдают оригинал.
+"""
+import os
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import cache
+from .models import Post
+
+# (ключ в image_variants, формат Pillow, расширение, параметры save)
+FORMATS = (
+    ('webp', 'WEBP', 'webp', {'method': 4}),
+    ('jpeg', 'JPEG', 'jpg', {'optimize': True, 'progressive': True}),
+)
+VARIANTS_DIR = 'variants'
+
+
+def get_widths():
+    return sorted(getattr(settings, 'BLOG_IMAGE_WIDTHS', (320, 640, 1280)))
+
+
+def get_quality():
+    return getattr(settings, 'BLOG_IMAGE_QUALITY', 80)
+
+
+def get_variant_name(source_name, width, extension):
+    directory, filename = os.path.split(source_name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(
+        directory, VARIANTS_DIR, f'{stem}-{width}w.{extension}'
+    )
+
+
+def get_target_widths(width):
+    """Ширины копий: не больше оригинала, сам оригинал — последней."""
+    widths = [target for target in get_widths() if target < width]
+    return widths + [min(width, get_widths()[-1])]
+
+
+def to_rgb(image):
+    """JPEG не умеет прозрачность — подкладываем белый фон."""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def encode(image, pil_format, options):
+    buffer = BytesIO()
+    if pil_format == 'JPEG':
+        image = to_rgb(image)
+    image.save(buffer, pil_format, quality=get_quality(), **options)
+    return buffer.getvalue()
+
+
+def make_variants(storage, source_name):
+    """Создаёт копии source_name в storage и возвращает image_variants."""
+    with storage.open(source_name, 'rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    width, height = image.size
+    variants = {
+        'source': source_name,
+        'width': width,
+        'height': height,
+    }
+    for key, _, _, _ in FORMATS:
+        variants[key] = {}
+
+    for target_width in get_target_widths(width):
+        target_height = max(1, round(height * target_width / width))
+        resized = image.resize(
+            (target_width, target_height), Image.LANCZOS
+        ) if target_width != width else image
+        for key, pil_format, extension, options in FORMATS:
+            name = storage.save(
+                get_variant_name(source_name, target_width, extension),
+                ContentFile(encode(resized, pil_format, options)),
+            )
+            variants[key][str(target_width)] = name
+    return variants
+
+
+def touch_variants(storage, variants):
+    """Обновляет время изменения копий: их не удалит sweep_images."""
+    for key, _, _, _ in FORMATS:
+        for name in variants.get(key, {}).values():
+            try:
+                os.utime(storage.path(name))
+            except FileNotFoundError:
+                continue
+
+
+def get_sweep_grace():
+    return getattr(settings, 'BLOG_IMAGE_SWEEP_GRACE', 60 * 60)
+
+
+def get_referenced_names():
+    """Файлы, на которые ссылаются посты: оригиналы и их копии."""
+    names = set()
+    rows = Post.objects.exclude(
+        Q(image='') | Q(image__isnull=True)
+    ).values_list('image', 'image_variants')
+    for image, variants in rows.iterator(chunk_size=2000):
+        names.add(image)
+        for key, _, _, _ in FORMATS:
+            names.update((variants or {}).get(key, {}).values())
+    return names
+
+
+def iter_stored_names(storage, directory):
+    directories, files = storage.listdir(directory)
+    for filename in files:
+        yield os.path.join(directory, filename)
+    for subdirectory in directories:
+        yield from iter_stored_names(
+            storage, os.path.join(directory, subdirectory)
+        )
+
+
+def sweep_unreferenced(storage, directory, grace=None):
+    """
+    Удаляет из directory файлы, на которые не ссылается ни один пост.
+
+    Одинаковые загрузки хранятся одним файлом (blog.storage), поэтому
+    удалять файл при удалении поста нельзя: его могут в этот момент
+    загрузить заново в ещё не закоммиченной транзакции. Вместо этого
+    файлы, к которым не обращались дольше grace секунд, удаляет
+    периодический manage.py sweep_images: любое сохранение файла
+    обновляет его время изменения.
+
+    Файл сначала переименовывается, и время проверяется ещё раз —
+    уже у переименованного: если его успели перезаписать, он
+    возвращается на место (содержимое то же, имя — хеш).
+    Возвращает список удалённых имён.
+    """
+    if grace is None:
+        grace = get_sweep_grace()
+    referenced = get_referenced_names()
+    cutoff = time.time() - grace
+    deleted = []
+    for name in iter_stored_names(storage, directory):
+        if name in referenced:
+            continue
+        path = storage.path(name)
+        trash_path = f'{path}.sweep'
+        try:
+            if os.path.getmtime(path) > cutoff:
+                continue
+            os.replace(path, trash_path)
+        except FileNotFoundError:
+            continue
+        if (
+            os.path.getmtime(trash_path) > cutoff
+            or Post.objects.filter(image=name).exists()
+        ):
+            os.replace(trash_path, path)
+            continue
+        os.remove(trash_path)
+        deleted.append(name)
+    return deleted
+
+
+def get_pending_posts(batch_size):
+    return list(
+        Post.objects.filter(image_variants={})
+        .exclude(Q(image='') | Q(image__isnull=True))
+        .only('id', 'image')[:batch_size]
+    )
+
+
+def find_ready_variants(source_name):
+    """Готовые копии того же файла у другого поста или None."""
+    candidates = Post.objects.filter(image=source_name).exclude(
+        image_variants={}
+    ).values_list('image_variants', flat=True)[:10]
+    for variants in candidates:
+        if variants.get('source') == source_name and 'error' not in variants:
+            return variants
+    return None
+
+
+def process_post(post):
+    """
+    Делает копии для одного поста. Возвращает True при успехе.
+
+    Битый файл помечается ошибкой, чтобы воркер не брал его снова.
+    """
+    storage = post.image.storage
+    source_name = post.image.name
+    try:
+        variants = find_ready_variants(source_name)
+        if variants:
+            touch_variants(storage, variants)
+        else:
+            variants = make_variants(storage, source_name)
+    except (OSError, ValueError, Image.DecompressionBombError) as error:
+        variants = {
+            'source': source_name,
+            'error': f'{type(error).__name__}: {error}',
+        }
+    # Пока копии делались, автор мог заменить картинку.
+    updated = Post.objects.filter(pk=post.pk, image=source_name).update(
+        image_variants=variants,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        # Копии без ссылок удалит manage.py sweep_images.
+        return False
+    cache.invalidate(cache.FEED_SCOPE, cache.post_scope(post.pk))
+    return 'error' not in variants
+
+
+def process_batch(batch_size=20):
+    """
+    Обрабатывает одну пачку постов без копий.
+
+    Возвращает кортеж (обработано, ошибок).
+    """
+    done = failed = 0
+    for post in get_pending_posts(batch_size):
+        if process_post(post):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
@@ -0,0 +1,59 @@
+import gzip
+import io
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.bulkload import load
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает фикстуру dumpdata (JSON или NDJSON, можно .gz) '
+        'через bulk_create, без сигналов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixture', help='Путь к файлу или «-» для чтения из stdin.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Сколько строк одной модели вставлять за раз.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База, в которую загружать данные.'
+        )
+        parser.add_argument(
+            '--ignorenonexistent', '-i', action='store_true',
+            help='Пропускать поля, которых нет в моделях.'
+        )
+
+    def open_fixture(self, path):
+        if path == '-':
+            return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+        try:
+            if path.endswith('.gz'):
+                return gzip.open(path, 'rt', encoding='utf-8')
+            return open(path, encoding='utf-8')
+        except OSError as error:
+            raise CommandError(f'Не удалось открыть {path}: {error}')
+
+    def handle(self, *args, **options):
+        with self.open_fixture(options['fixture']) as stream:
+            counts, elapsed = load(
+                stream,
+                using=options['database'],
+                batch_size=options['batch_size'],
+                ignorenonexistent=options['ignorenonexistent'],
+            )
+        total = sum(counts.values())
+        for label, count in sorted(counts.items()):
+            self.stdout.write(f'{label}: {count}')
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено строк: {total} за {elapsed:.2f} с '
+            f'({rate:.0f} строк/с)'
+        ))
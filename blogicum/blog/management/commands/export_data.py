@@ -0,0 +1,65 @@
+import codecs
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import EXPORTS, FORMATS, export
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты или комментарии в NDJSON или CSV потоком'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '--format', dest='export_format', choices=FORMATS,
+            default='ndjson',
+        )
+        parser.add_argument(
+            '--gzip', action='store_true', help='Сжимать вывод gzip.'
+        )
+        parser.add_argument(
+            '--output', '-o', default='-',
+            help='Файл для выгрузки; по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Сколько строк читать из базы за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        chunks = export(
+            options['kind'],
+            options['export_format'],
+            compress=options['gzip'],
+            batch_size=options['batch_size'],
+        )
+        if options['output'] == '-':
+            self.write_stdout(chunks, options['gzip'])
+            return
+        with open(options['output'], 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stderr.write(self.style.SUCCESS(
+            f'Выгрузка записана в {options["output"]}'
+        ))
+
+    def write_stdout(self, chunks, compressed):
+        """
+        Пишет в self.stdout: в его двоичный buffer, если он есть
+        (обычный stdout), иначе — текстом (call_command(stdout=...)).
+        """
+        self.stdout.flush()
+        output = getattr(self.stdout, 'buffer', None)
+        if output is not None:
+            for chunk in chunks:
+                output.write(chunk)
+            output.flush()
+            return
+        if compressed:
+            raise CommandError(
+                'Вывод не принимает байты: для --gzip укажите --output.'
+            )
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        for chunk in chunks:
+            self.stdout.write(decoder.decode(chunk), ending='')
+        self.stdout.write(decoder.decode(b'', final=True), ending='')
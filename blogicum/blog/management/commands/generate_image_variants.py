@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.images import process_batch
+
+
+class Command(BaseCommand):
+    help = 'Делает уменьшенные копии изображений постов (WebP и JPEG)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=20,
+            help='Сколько постов обрабатывать за один проход.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, ожидая новые изображения.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между опросами, когда обрабатывать нечего, секунд.'
+        )
+
+    def handle(self, *args, **options):
+        total_done = total_failed = 0
+        while True:
+            done, failed = process_batch(options['batch_size'])
+            total_done += done
+            total_failed += failed
+            if done or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {total_done}, ошибок: {total_failed}'
+        ))
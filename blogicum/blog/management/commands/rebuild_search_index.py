@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog import search
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс постов и комментариев'
+
+    def handle(self, *args, **options):
+        if not search.is_enabled():
+            self.stdout.write('Полнотекстовый индекс нужен только для SQLite.')
+            return
+        search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс пересобран'))
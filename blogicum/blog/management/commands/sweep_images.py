@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import get_sweep_grace, sweep_unreferenced
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы изображений, на которые не ссылается ни один пост '
+        '(запускать периодически, например из cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=float, default=None,
+            help='Не трогать файлы моложе стольких секунд '
+            '(по умолчанию BLOG_IMAGE_SWEEP_GRACE).'
+        )
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        grace = options['grace']
+        deleted = sweep_unreferenced(
+            field.storage,
+            field.upload_to.rstrip('/'),
+            get_sweep_grace() if grace is None else grace,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено файлов: {len(deleted)}'
+        ))
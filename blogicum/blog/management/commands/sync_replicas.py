@@ -0,0 +1,40 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу в реплики из DATABASE_REPLICAS '
+        '(для локальной проверки чтения с реплик)'
+    )
+
+    def handle(self, *args, **options):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if not replicas:
+            raise CommandError(
+                'Реплики не настроены: задайте BLOGICUM_DB_REPLICAS.'
+            )
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Команда копирует только SQLite-базы.')
+        source = sqlite3.connect(primary.settings_dict['NAME'])
+        try:
+            for alias in replicas:
+                target_name = connections[alias].settings_dict['NAME']
+                connections[alias].close()
+                target = sqlite3.connect(target_name)
+                try:
+                    # backup API даёт согласованный снимок даже
+                    # во время записи в основную базу.
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: {target_name}')
+        finally:
+            source.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено реплик: {len(replicas)}'
+        ))
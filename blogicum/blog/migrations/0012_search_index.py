@@ -0,0 +1,41 @@
+from django.db import migrations
+
+TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2'"
+
+FORWARD_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts '
+    f'USING fts5(title, text, {TOKENIZE})',
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS blog_comment_fts '
+    f'USING fts5(text, post_id UNINDEXED, {TOKENIZE})',
+    'INSERT INTO blog_post_fts (rowid, title, text) '
+    'SELECT id, title, text FROM blog_post',
+    'INSERT INTO blog_comment_fts (rowid, text, post_id) '
+    'SELECT id, text, post_id FROM blog_comment WHERE is_published',
+)
+
+BACKWARD_SQL = (
+    'DROP TABLE IF EXISTS blog_post_fts',
+    'DROP TABLE IF EXISTS blog_comment_fts',
+)
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(FORWARD_SQL), run_on_sqlite(BACKWARD_SQL)
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Заполняет воркер manage.py generate_image_variants (см. blog.images); пусто — копии ещё не готовы.', verbose_name='Уменьшенные копии изображения'),
+        ),
+    ]
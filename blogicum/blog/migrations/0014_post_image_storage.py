@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:54
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Добавьте изображение к публикации', null=True, storage=blog.storage.ContentAddressedStorage(), upload_to='post_images/', verbose_name='Изображение публикации'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['image'], name='post_image_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:12
+
+import blog.fields
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def fill_model(model, fields):
+    batch = []
+    for obj in model.objects.only('pk', 'text').iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        for name in fields:
+            model._meta.get_field(name).pre_save(obj, add=False)
+        batch.append(obj)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, fields)
+
+
+def fill_rendered_text(apps, schema_editor):
+    fill_model(apps.get_model('blog', 'Post'), ['excerpt', 'text_html'])
+    fill_model(apps.get_model('blog', 'Comment'), ['text_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=blog.fields.DerivedTextField(render=blog.fields.render_text, source='text', verbose_name='Текст комментария в HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=blog.fields.DerivedCharField(max_length=512, render=blog.fields.make_excerpt, source='text', verbose_name='Начало текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=blog.fields.DerivedTextField(render=blog.fields.render_text, source='text', verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(fill_rendered_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_comment_rendered_text'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Меняется и при любых изменениях комментариев: входит в ETag страницы поста и API.', verbose_name='Изменено'),
+        ),
+    ]
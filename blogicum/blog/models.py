@@ -1,35 +1,50 @@
+from collections import Counter
+
+from django.conf import settings
 from django.db import models
-from django.db.models import Count
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from .fields import (
+    DerivedCharField, DerivedFieldsModelMixin, DerivedTextField,
+    make_excerpt, render_text
+)
+from .storage import ContentAddressedStorage
+
+
+# Колонки карточки поста (includes/post_card.html и post_image.html),
+# ключа её кеша (Post.card_version) и курсорной пагинации.
+CARD_FIELDS = (
+    'id', 'title', 'excerpt', 'pub_date', 'updated_at', 'is_published',
+    'comment_count', 'image', 'image_variants',
+    'author', 'author__username',
+    'category', 'category__title', 'category__slug',
+    'category__is_published',
+    'location', 'location__name', 'location__is_published',
+)
+
 
 class PostQuerySet(models.QuerySet):
     """Кастомный QuerySet для модели Post"""
 
-    def with_comments_and_filter(self, only_published=True):
-        """
-        Объединяет фильтрацию по опубликованности и добавление количества комментариев.
-        
-        Аргументы:
-            only_published (bool): Если True - фильтрует только опубликованные посты.
-                                  Если False - возвращает все посты (для автора).
-        """
-        queryset = self
-        
-        if only_published:
-            queryset = queryset.filter(
-                is_published=True,
-                pub_date__lte=timezone.now(),
-                category__is_published=True
-            )
-        
-        return queryset.annotate(comment_count=Count('comments'))
-    
-    def with_comments_count(self):
-        """Добавляет количество комментариев к каждому посту в QuerySet"""
-        return self.annotate(comment_count=Count('comments'))
-    
+    def recount_comments(self):
+        """
+        Пересчитывает comment_count одним UPDATE по подзапросу.
+
+        Возвращает число обновлённых постов.
+        """
+        counts = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            total=Count('pk')
+        ).values('total')
+        return self.update(
+            comment_count=Coalesce(Subquery(counts), 0)
+        )
+
     def published(self):
         """Только опубликованные посты"""
         return self.filter(
@@ -38,6 +53,32 @@ class PostQuerySet(models.QuerySet):
             category__is_published=True
         )
 
+    def only_card_fields(self):
+        """
+        Загружает только колонки, которые выводит карточка поста.
+
+        Полный текст (text, text_html) и служебные поля остаются
+        в базе: у длинных постов они и есть почти весь объём строки.
+        Обращение к не загруженному полю в шаблоне карточки стоило бы
+        запроса на каждый пост — это ловит tests/test_query_counts.py.
+        """
+        return self.only(*CARD_FIELDS)
+
+    def for_feed(self):
+        """
+        Посты для лент (главная, категория, профиль, поиск).
+
+        Подтягивает одним JOIN-запросом всё, что выводит карточка поста
+        (includes/post_card.html): автора, категорию и местоположение,
+        а также количество комментариев; лишние колонки не загружаются
+        (only_card_fields).
+        Вторичная сортировка по id делает порядок однозначным,
+        на нём держится курсорная пагинация (blog.paginators).
+        """
+        return self.select_related(
+            'author', 'category', 'location'
+        ).only_card_fields().order_by('-pub_date', '-id')
+
 
 class Category (models.Model):
     """
@@ -109,7 +150,7 @@ class Location(models.Model):
 User = get_user_model()
 
 
-class Post(models.Model):
+class Post(DerivedFieldsModelMixin, models.Model):
     """
     Публикация.
     Post
@@ -121,6 +162,19 @@ class Post(models.Model):
         help_text="""
         """
     )
+    # Готовые к выводу производные text: лентам и странице поста
+    # не нужно грузить и прогонять через фильтры полный текст.
+    excerpt = DerivedCharField(
+        max_length=512,
+        source='text',
+        render=make_excerpt,
+        verbose_name='Начало текста',
+    )
+    text_html = DerivedTextField(
+        source='text',
+        render=render_text,
+        verbose_name='Текст в HTML',
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -157,33 +211,185 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+        help_text='Меняется и при любых изменениях комментариев: '
+        'входит в ETag страницы поста и API.'
+    )
     image = models.ImageField(
         upload_to='post_images/',
+        storage=ContentAddressedStorage(),
         blank=True,
         null=True,
         verbose_name='Изображение публикации',
         help_text='Добавьте изображение к публикации'
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии изображения',
+        help_text='Заполняет воркер manage.py generate_image_variants '
+        '(см. blog.images); пусто — копии ещё не готовы.'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+        help_text='Поддерживается сигналами blog.signals; '
+        'пересчитать целиком: manage.py recount_comments.'
+    )
 
     objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = [
+            # Главная лента: is_published + pub_date <= now,
+            # ORDER BY -pub_date, -id (см. PostQuerySet.for_feed).
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            # Лента категории: category + тот же предикат.
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            # API (/api/v1/posts/) отдаёт все посты курсором
+            # по (pub_date, id).
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_idx',
+            ),
+            # Профиль: автор видит и неопубликованные посты.
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx',
+            ),
+            # Ссылается ли ещё кто-то на файл изображения
+            # (blog.images.sweep_unreferenced).
+            models.Index(fields=['image'], name='post_image_idx'),
+        ]
 
     ordering = ['-pub_date']
 
     def __str__(self):
         return self.title
 
+    def get_ready_variants(self):
+        """image_variants, если они сделаны для текущего изображения."""
+        variants = self.image_variants or {}
+        if (
+            not self.image
+            or 'error' in variants
+            or variants.get('source') != self.image.name
+        ):
+            return {}
+        return variants
+
+    def get_image_srcset(self, image_format, absolute_url=None):
+        """
+        Строка srcset вида «url 320w, url 640w» или ''.
+
+        absolute_url — например, request.build_absolute_uri для API.
+        """
+        url = self.image.storage.url
+        if absolute_url is not None:
+            def url(name, storage_url=url):
+                return absolute_url(storage_url(name))
+        return ', '.join(
+            f'{url(name)} {width}w'
+            for width, name in sorted(
+                self.get_ready_variants().get(image_format, {}).items(),
+                key=lambda item: int(item[0]),
+            )
+        )
+
+    @property
+    def image_srcset_webp(self):
+        return self.get_image_srcset('webp')
+
+    @property
+    def image_srcset_jpeg(self):
+        return self.get_image_srcset('jpeg')
+
+    @property
+    def image_src(self):
+        """Запасной src: самая крупная JPEG-копия или оригинал."""
+        jpeg = self.get_ready_variants().get('jpeg')
+        if not jpeg:
+            return self.image.url
+        return self.image.storage.url(jpeg[max(jpeg, key=int)])
 
-class Comment(models.Model):
+    @property
+    def card_version(self):
+        """
+        Версия карточки поста для кеша фрагмента в post_card.html.
+
+        Поля самого поста (и comment_count) сдвигают updated_at;
+        автор, категория и местоположение выводятся в карточке,
+        но хранятся в своих таблицах, поэтому входят явно.
+        """
+        location = self.location
+        return '|'.join(map(str, (
+            self.updated_at and self.updated_at.timestamp(),
+            self.author.username,
+            self.category_id and self.category.slug,
+            self.category_id and self.category.title,
+            self.category_id and self.category.is_published,
+            location and location.name,
+            location and location.is_published,
+        )))
+
+
+# Комментарии удалены через Comment.delete() или CommentQuerySet.delete().
+# Аргументы: post_counts — {id поста: сколько его комментариев удалено},
+# comment_ids — id удалённых комментариев.
+comments_deleted = Signal()
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def delete(self):
+        """
+        Удаляет выборку и один раз сообщает об этом (comments_deleted).
+
+        У Comment нет получателей pre_delete/post_delete: с ними Django
+        не смог бы удалять комментарии одним запросом при каскаде
+        (удаление поста или пользователя). Каскады обрабатывают
+        получатели Post и User в blog.signals.
+        """
+        rows = list(self.order_by().values_list('pk', 'post_id'))
+        result = super().delete()
+        if rows:
+            comments_deleted.send(
+                sender=self.model,
+                post_counts=Counter(post_id for _, post_id in rows),
+                comment_ids=[pk for pk, _ in rows],
+            )
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class Comment(DerivedFieldsModelMixin, models.Model):
     """Комментарий к публикации."""
 
     text = models.TextField(
         verbose_name='Текст комментария',
         help_text='Введите текст комментария'
     )
+    text_html = DerivedTextField(
+        source='text',
+        render=render_text,
+        verbose_name='Текст комментария в HTML',
+    )
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -204,10 +410,136 @@ class Comment(models.Model):
         verbose_name='Опубликовано'
     )
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['created_at']  # Сортировка от старых к новым
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'Комментарий {self.author} к посту {self.post.id}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем исходный пост, чтобы при переносе комментария
+        # (например, в админке) поправить счётчики у обоих постов.
+        instance._loaded_post_id = instance.__dict__.get('post_id')
+        return instance
+
+    def delete(self, *args, **kwargs):
+        pk, post_id = self.pk, self.post_id
+        result = super().delete(*args, **kwargs)
+        comments_deleted.send(
+            sender=type(self),
+            post_counts={post_id: 1},
+            comment_ids=[pk],
+        )
+        return result
+
+    @staticmethod
+    def change_post_counter(post_id, delta=0):
+        """
+        Атомарно сдвигает Post.comment_count на delta.
+
+        Заодно обновляет Post.updated_at: страница поста и его
+        карточка изменились, даже если счётчик остался прежним
+        (delta=0 — комментарий отредактирован).
+        """
+        if post_id is None:
+            return
+        Post.objects.filter(pk=post_id).update(
+            comment_count=F('comment_count') + delta,
+            updated_at=timezone.now(),
+        )
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в очереди на отправку (outbox).
+
+    Views только кладут письмо в таблицу; отправляет его воркер
+    manage.py send_outbox (см. blog.outbox).
+    """
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не удалось отправить'),
+    )
+
+    subject = models.CharField(max_length=256, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст письма')
+    from_email = models.CharField(
+        max_length=254,
+        verbose_name='Отправитель'
+    )
+    recipients = models.TextField(
+        verbose_name='Получатели',
+        help_text='По одному адресу в строке.'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+
+    class Meta:
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                condition=models.Q(status='pending'),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} → {self.recipients}'
+
+    @classmethod
+    def enqueue(cls, subject, body, recipient_list, from_email=None):
+        """Ставит письмо в очередь вместо синхронной отправки."""
+        return cls.objects.create(
+            subject=subject,
+            body=body,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            recipients='\n'.join(recipient_list),
+        )
+
+    def get_recipient_list(self):
+        return [line for line in self.recipients.splitlines() if line]
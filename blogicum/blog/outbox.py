@@ -0,0 +1,132 @@
+"""
+Отправка писем из очереди OutgoingEmail.
+
+Письма уходят пачками через одно SMTP-соединение (или любой другой
+EMAIL_BACKEND). Неудачная попытка откладывает письмо с экспоненциальной
+задержкой; после BLOG_OUTBOX_MAX_ATTEMPTS попыток оно помечается
+как неотправленное и больше не берётся в работу.
+
+Перед отправкой пачка захватывается одним UPDATE: next_attempt_at
+сдвигается на BLOG_OUTBOX_CLAIM_TIMEOUT вперёд, и только строки,
+которые этот UPDATE изменил, уходят в отправку. Поэтому несколько
+воркеров (send_outbox --loop и cron) не отправят письмо дважды,
+а письма упавшего воркера вернутся в очередь по истечении срока.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def get_retry_delay(attempts):
+    """Задержка перед следующей попыткой: base * 2^(n-1), с потолком."""
+    base = getattr(settings, 'BLOG_OUTBOX_RETRY_DELAY', 60)
+    limit = getattr(settings, 'BLOG_OUTBOX_MAX_RETRY_DELAY', 60 * 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), limit))
+
+
+def get_claim_timeout():
+    return timedelta(
+        seconds=getattr(settings, 'BLOG_OUTBOX_CLAIM_TIMEOUT', 10 * 60)
+    )
+
+
+def get_due_ids(batch_size):
+    return list(
+        OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING,
+            next_attempt_at__lte=timezone.now(),
+        ).values_list('pk', flat=True)[:batch_size]
+    )
+
+
+def claim_emails(ids):
+    """
+    Захватывает письма ids, которые ещё ждут отправки.
+
+    Возвращает только захваченные этим вызовом: строки, уже взятые
+    другим воркером, UPDATE не тронет — их next_attempt_at в будущем.
+    """
+    now = timezone.now()
+    claimed_until = now + get_claim_timeout()
+    with transaction.atomic():
+        claimed = OutgoingEmail.objects.filter(
+            pk__in=ids,
+            status=OutgoingEmail.PENDING,
+            next_attempt_at__lte=now,
+        ).update(next_attempt_at=claimed_until)
+        if not claimed:
+            return []
+        return list(OutgoingEmail.objects.filter(
+            pk__in=ids,
+            status=OutgoingEmail.PENDING,
+            next_attempt_at=claimed_until,
+        ))
+
+
+def get_due_emails(batch_size):
+    return claim_emails(get_due_ids(batch_size))
+
+
+def mark_failed_attempt(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    if email.attempts >= max_attempts:
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.next_attempt_at = (
+            timezone.now() + get_retry_delay(email.attempts)
+        )
+    email.save(update_fields=(
+        'attempts', 'last_error', 'status', 'next_attempt_at'
+    ))
+
+
+def send_batch(batch_size=50, max_attempts=None):
+    """
+    Захватывает и отправляет одну пачку писем, чей срок подошёл.
+
+    Возвращает кортеж (отправлено, неудачных попыток).
+    """
+    if max_attempts is None:
+        max_attempts = getattr(settings, 'BLOG_OUTBOX_MAX_ATTEMPTS', 5)
+    emails = get_due_emails(batch_size)
+    if not emails:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed_attempt(email, error, max_attempts)
+        return 0, len(emails)
+
+    sent = failed = 0
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                email.get_recipient_list(),
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                mark_failed_attempt(email, error, max_attempts)
+                failed += 1
+                continue
+            email.attempts += 1
+            email.status = OutgoingEmail.SENT
+            email.sent_at = timezone.now()
+            email.save(update_fields=('attempts', 'status', 'sent_at'))
+            sent += 1
+    finally:
+        connection.close()
+    return sent, failed
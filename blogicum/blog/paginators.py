@@ -0,0 +1,116 @@
+import base64
+import binascii
+from collections.abc import Sequence
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class KeysetPage(Sequence):
+    """
+    Страница курсорной пагинации.
+
+    Повторяет ту часть интерфейса django.core.paginator.Page,
+    которой пользуются шаблоны, но вместо номеров страниц
+    отдаёт курсоры соседних страниц.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage: {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Курсорная (keyset) пагинация по паре (pub_date, id).
+
+    Вместо OFFSET и COUNT(*) страница выбирается условием
+    «строго после/до последней показанной записи», поэтому
+    любая страница стоит столько же, сколько первая.
+    QuerySet должен быть отсортирован по ('-pub_date', '-id').
+    """
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    @classmethod
+    def encode_cursor(cls, direction, post):
+        raw = f'{direction}|{post.pub_date.isoformat()}|{post.pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @classmethod
+    def decode_cursor(cls, cursor):
+        """Возвращает (направление, pub_date, id) или None."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            direction, pub_date, pk = raw.split('|')
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            return None
+        if direction not in (cls.NEXT, cls.PREVIOUS) or pub_date is None:
+            return None
+        return direction, pub_date, pk
+
+    def get_page(self, cursor):
+        """
+        Страница после/до курсора.
+
+        Пустой или некорректный курсор даёт первую страницу —
+        так же, как Paginator.get_page() прощает плохой номер.
+        """
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            rows = list(self.queryset[:self.per_page + 1])
+            return self._build_page(rows, has_previous=False)
+
+        direction, pub_date, pk = decoded
+        if direction == self.NEXT:
+            rows = list(self.queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )[:self.per_page + 1])
+            return self._build_page(rows, has_previous=True)
+
+        rows = list(self.queryset.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+        ).reverse()[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return self._build_page(rows, has_previous, has_next=True)
+
+    def _build_page(self, rows, has_previous, has_next=None):
+        if has_next is None:
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(self.NEXT, rows[-1])
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(self.PREVIOUS, rows[0])
+        return KeysetPage(rows, next_cursor, previous_cursor)
@@ -0,0 +1,200 @@
+"""
+Полнотекстовый поиск по постам и комментариям (SQLite FTS5).
+
+Индекс — две виртуальные таблицы (создаются миграцией):
+
+* blog_post_fts(title, text), rowid = Post.id;
+* blog_comment_fts(text, post_id UNINDEXED), rowid = Comment.id.
+
+Сигналы (blog.signals) обновляют индекс при каждом изменении,
+manage.py rebuild_search_index пересобирает индекс целиком.
+Результаты ранжируются bm25: совпадение в заголовке весит больше,
+чем в тексте, а пост получает лучший ранг из своих совпадений.
+
+На других СУБД поиск сводится к icontains, индекс не ведётся.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+POST_TABLE = 'blog_post_fts'
+COMMENT_TABLE = 'blog_comment_fts'
+MAX_QUERY_PARAMS = 900
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {POST_TABLE} USING fts5("
+    "title, text, tokenize = 'unicode61 remove_diacritics 2')",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {COMMENT_TABLE} USING fts5("
+    "text, post_id UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')",
+)
+DROP_SQL = (
+    f'DROP TABLE IF EXISTS {POST_TABLE}',
+    f'DROP TABLE IF EXISTS {COMMENT_TABLE}',
+)
+
+# Видимость (PostQuerySet.published) проверяется до LIMIT: иначе
+# скрытые посты занимали бы места в выдаче.
+RANKED_IDS_SQL = f"""
+    SELECT matches.post_id FROM (
+        SELECT rowid AS post_id, bm25({POST_TABLE}, 5.0, 1.0) AS rank
+        FROM {POST_TABLE} WHERE {POST_TABLE} MATCH %s
+        UNION ALL
+        SELECT post_id, bm25({COMMENT_TABLE}) AS rank
+        FROM {COMMENT_TABLE} WHERE {COMMENT_TABLE} MATCH %s
+    ) AS matches
+    INNER JOIN blog_post ON blog_post.id = matches.post_id
+    INNER JOIN blog_category ON blog_category.id = blog_post.category_id
+    WHERE blog_post.is_published
+        AND blog_post.pub_date <= %s
+        AND blog_category.is_published
+    GROUP BY matches.post_id
+    ORDER BY MIN(matches.rank)
+    LIMIT %s
+"""
+
+
+def is_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """
+    Превращает строку пользователя в безопасный запрос MATCH.
+
+    Каждое слово — отдельная фраза с поиском по префиксу,
+    слова объединяются через AND. Операторы FTS5 из ввода
+    не интерпретируются.
+    """
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def get_ranked_post_ids(text):
+    """
+    Возвращает id подходящих под запрос опубликованных постов,
+    от лучшего к худшему.
+    """
+    from .models import Post
+
+    limit = getattr(settings, 'BLOG_SEARCH_MAX_RESULTS', 500)
+    if not is_enabled():
+        return list(Post.objects.published().filter(
+            Q(title__icontains=text)
+            | Q(text__icontains=text)
+            | Q(comments__text__icontains=text,
+                comments__is_published=True)
+        ).order_by('-pub_date').values_list('pk', flat=True).distinct()[
+            :limit
+        ])
+
+    match = build_match_query(text)
+    if not match:
+        return []
+    with connection.cursor() as cursor:
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        cursor.execute(RANKED_IDS_SQL, [match, match, now, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def index_post(post):
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {POST_TABLE} WHERE rowid = %s', [post.pk]
+        )
+        cursor.execute(
+            f'INSERT INTO {POST_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            [post.pk, post.title, post.text],
+        )
+
+
+def unindex_post(post_id):
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {POST_TABLE} WHERE rowid = %s', [post_id]
+        )
+
+
+def index_comment(comment):
+    """Индексирует опубликованный комментарий, снятый — убирает."""
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {COMMENT_TABLE} WHERE rowid = %s', [comment.pk]
+        )
+        if comment.is_published:
+            cursor.execute(
+                f'INSERT INTO {COMMENT_TABLE} (rowid, text, post_id) '
+                'VALUES (%s, %s, %s)',
+                [comment.pk, comment.text, comment.post_id],
+            )
+
+
+def unindex_comments(comment_ids):
+    """Убирает из индекса комментарии по списку id."""
+    if not is_enabled():
+        return
+    comment_ids = list(comment_ids)
+    with connection.cursor() as cursor:
+        # У SQLite ограничение на число параметров в запросе.
+        for start in range(0, len(comment_ids), MAX_QUERY_PARAMS):
+            batch = comment_ids[start:start + MAX_QUERY_PARAMS]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(
+                f'DELETE FROM {COMMENT_TABLE} '
+                f'WHERE rowid IN ({placeholders})',
+                batch,
+            )
+
+
+def unindex_comments_of(column, value):
+    """
+    Убирает из индекса комментарии, у которых column = value.
+
+    Для каскадного удаления поста (column='post_id') или автора
+    (column='author_id'): один DELETE с подзапросом, пока строки
+    blog_comment ещё на месте, — поиск идёт по индексу внешнего ключа.
+    """
+    if not is_enabled():
+        return
+    if column not in ('post_id', 'author_id'):
+        raise ValueError(f'Неизвестная колонка: {column}')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {COMMENT_TABLE} WHERE rowid IN '
+            f'(SELECT id FROM blog_comment WHERE {column} = %s)',
+            [value],
+        )
+
+
+def rebuild_index():
+    """Пересобирает оба FTS-индекса из таблиц постов и комментариев."""
+    if not is_enabled():
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        for sql in DROP_SQL + CREATE_SQL:
+            cursor.execute(sql)
+        cursor.execute(
+            f'INSERT INTO {POST_TABLE} (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post'
+        )
+        cursor.execute(
+            f'INSERT INTO {COMMENT_TABLE} (rowid, text, post_id) '
+            'SELECT id, text, post_id FROM blog_comment '
+            'WHERE is_published'
+        )
+        cursor.execute(
+            f"INSERT INTO {POST_TABLE} ({POST_TABLE}) VALUES ('optimize')"
+        )
+        cursor.execute(
+            f"INSERT INTO {COMMENT_TABLE} ({COMMENT_TABLE}) "
+            "VALUES ('optimize')"
+        )
@@ -0,0 +1,152 @@
+from collections import Counter
+
+from django.db.models import Count
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from . import cache, search
+from .models import (
+    Category, Comment, Location, Post, User, comments_deleted
+)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count_on_save(sender, instance, created, raw, **kwargs):
+    """Новый, отредактированный или перенесённый комментарий."""
+    old_post_id = getattr(instance, '_loaded_post_id', instance.post_id)
+    if created and not raw:
+        Comment.change_post_counter(instance.post_id, 1)
+    elif old_post_id != instance.post_id and not raw:
+        Comment.change_post_counter(old_post_id, -1)
+        Comment.change_post_counter(instance.post_id, 1)
+    elif not raw:
+        Comment.change_post_counter(instance.post_id)
+    instance._loaded_post_id = instance.post_id
+    invalidate_comment_pages({old_post_id, instance.post_id})
+
+
+def invalidate_comment_pages(post_ids):
+    """
+    Страницы постов post_ids и страницы лент с их карточками.
+
+    Лента целиком не сбрасывается: страница ленты зависит от областей
+    своих постов (blog.cache.depends_on).
+    """
+    cache.invalidate(cache.COMMENTS_SCOPE, *(
+        cache.post_scope(post_id) for post_id in post_ids if post_id
+    ))
+
+
+def update_posts_after_comments_removed(post_counts):
+    """Сдвигает счётчики постов, чьи комментарии удалены."""
+    for post_id, count in post_counts.items():
+        Comment.change_post_counter(post_id, -count)
+    if post_counts:
+        invalidate_comment_pages(post_counts)
+
+
+@receiver(comments_deleted, sender=Comment)
+def update_posts_on_comments_deleted(sender, post_counts, comment_ids,
+                                     **kwargs):
+    """Comment.delete() и CommentQuerySet.delete(): одна пачка."""
+    search.unindex_comments(comment_ids)
+    update_posts_after_comments_removed(post_counts)
+
+
+# При удалении поста или пользователя комментарии удаляет каскад
+# одним DELETE, без сигналов Comment (см. CommentQuerySet.delete),
+# поэтому индекс и счётчики правим здесь — по разу на пост/автора.
+
+@receiver(pre_delete, sender=Post)
+def unindex_post_comments(sender, instance, **kwargs):
+    # Сам пост вместе со счётчиком удаляется, править его не нужно.
+    search.unindex_comments_of('post_id', instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def unindex_user_comments(sender, instance, **kwargs):
+    # Счётчики нужны только у чужих постов: свои удалит каскад.
+    instance._commented_posts = Counter(dict(
+        Comment.objects.filter(author=instance).exclude(
+            post__author=instance
+        ).order_by().values('post').annotate(
+            total=Count('pk')
+        ).values_list('post', 'total')
+    ))
+    search.unindex_comments_of('author_id', instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def update_commented_posts(sender, instance, **kwargs):
+    update_posts_after_comments_removed(
+        getattr(instance, '_commented_posts', {})
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    cache.invalidate(cache.FEED_SCOPE, cache.post_scope(instance.pk))
+
+
+@receiver(pre_save, sender=User)
+def remember_username_change(sender, instance, update_fields, **kwargs):
+    if instance.pk is None or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    old_username = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    instance._username_changed = old_username not in (
+        None, instance.username
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, **kwargs):
+    # Имя автора выводится в карточках и на страницах его постов.
+    if getattr(instance, '_username_changed', False):
+        instance._username_changed = False
+        cache.invalidate(cache.GLOBAL_SCOPE)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_pages(sender, instance, **kwargs):
+    cache.invalidate(cache.GLOBAL_SCOPE)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw, **kwargs):
+    if not raw:
+        search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, raw, **kwargs):
+    if not raw:
+        search.index_comment(instance)
+
+
+@receiver(pre_save, sender=Post)
+def reset_image_variants(sender, instance, raw, **kwargs):
+    """
+    Новое изображение: копии сделает воркер.
+
+    Старый файл не удаляется: его подберёт manage.py sweep_images.
+    """
+    if raw:
+        return
+    variants = instance.image_variants
+    if variants and variants.get('source') != instance.image.name:
+        instance.image_variants = {}
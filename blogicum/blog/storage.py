@@ -0,0 +1,117 @@
+"""
+Хранилище изображений постов с адресацией по содержимому.
+
+Имя файла — sha256 его содержимого, файлы разложены по подкаталогам
+по первым символам хеша, чтобы в одном каталоге не копились
+десятки тысяч файлов:
+
+    post_images/3f/a1/3fa1…c2.jpg
+
+Одинаковые картинки, загруженные повторно, хранятся одним файлом
+и отдаются по одному URL.
+
+Файл читается один раз: куски пишутся во временный файл рядом
+с пулом и тут же хешируются, затем временный файл атомарно
+переименовывается в имя-хеш. Каждое сохранение, даже повторное,
+обновляет время изменения файла — на это опирается
+manage.py sweep_images (blog.images.sweep_unreferenced), который
+удаляет файлы, на которые больше не ссылается ни один пост.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+from django.utils.deconstruct import deconstructible
+
+HASH_CHUNK_SIZE = 64 * 1024
+TEMP_PREFIX = '.upload-'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage, сохраняющий файлы под именем-хешем."""
+
+    def get_hashed_name(self, name, content_hash):
+        # Верхний каталог (upload_to) сохраняем, остальной путь
+        # заменяем хешем: копии изображений из blog.images ложатся
+        # в тот же пул, что и оригиналы.
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(
+            self.get_root(name),
+            content_hash[:2],
+            content_hash[2:4],
+            f'{content_hash}{extension}',
+        )
+
+    def get_root(self, name):
+        """Верхний каталог имени (upload_to) или '' для имени без него."""
+        parts = name.replace('\\', '/').split('/')
+        return parts[0] if len(parts) > 1 else ''
+
+    def save(self, name, content, max_length=None):
+        # Как Storage.save, но без get_available_name: имя
+        # определяется содержимым, а не свободными местами в каталоге.
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self._save(name, content)
+        validate_file_name(name, allow_relative_path=True)
+        return name
+
+    def make_directory(self, directory):
+        # Как в FileSystemStorage._save: права каталогов без umask.
+        if self.directory_permissions_mode is None:
+            os.makedirs(directory, exist_ok=True)
+            return
+        old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+        try:
+            os.makedirs(
+                directory, self.directory_permissions_mode, exist_ok=True
+            )
+        finally:
+            os.umask(old_umask)
+
+    def write_temporary(self, directory, content):
+        """Пишет content во временный файл; (путь, sha256)."""
+        self.make_directory(directory)
+        digest = hashlib.sha256()
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=TEMP_PREFIX
+        )
+        try:
+            with os.fdopen(descriptor, 'wb') as temp_file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks(HASH_CHUNK_SIZE):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return temp_path, digest.hexdigest()
+
+    def _save(self, name, content):
+        # Временный файл — в каталоге пула (upload_to), на той же
+        # файловой системе, что и итоговый: переименование атомарно.
+        temp_path, content_hash = self.write_temporary(
+            self.path(self.get_root(name)), content
+        )
+        name = self.get_hashed_name(name, content_hash)
+        try:
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            full_path = self.path(name)
+            self.make_directory(os.path.dirname(full_path))
+            # Файл с тем же именем — с тем же содержимым: замена
+            # безопасна и заодно обновляет время изменения.
+            os.replace(temp_path, full_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return name
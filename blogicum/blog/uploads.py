@@ -0,0 +1,218 @@
+"""
+Потоковая проверка загружаемых изображений.
+
+ImageUploadLimitHandler ставится первым обработчиком загрузок только
+там, где принимают изображение поста: декоратор limit_image_uploads
+у post_create / post_edit и PostViewSet в API. Он видит каждый кусок
+поля image раньше, чем его сохранят следующие обработчики (остальные
+файлы пропускает как есть):
+
+* считает байты и, как только файл превысил BLOG_IMAGE_MAX_BYTES
+  (или сразу, если размер известен заранее), прекращает разбор
+  запроса — StopUpload(connection_reset=True), остаток тела не
+  читается; view отвечает 413;
+* по первым байтам (не больше BLOG_IMAGE_PROBE_BYTES) открывает
+  картинку через Image.open — Pillow читает только заголовок,
+  пиксели не декодируются — и проверяет ширину × высоту
+  на BLOG_IMAGE_MAX_PIXELS.
+
+Файл, отклонённый по заголовку, не сохраняется: дальше его куски
+не передаются, а вместо файла в request.FILES попадает RejectedUpload
+с текстом ошибки. LimitedImageField превращает его в ошибку поля
+формы, так что остальные поля формы не теряются.
+"""
+from functools import wraps
+from io import BytesIO
+
+from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.http import HttpResponse
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+# Исключения, которыми Image.open сообщает, что заголовок
+# не распознан или обрезан.
+PROBE_ERRORS = (OSError, SyntaxError, ValueError, EOFError, IndexError)
+
+
+def get_max_bytes():
+    return getattr(settings, 'BLOG_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+
+
+def get_max_pixels():
+    return getattr(settings, 'BLOG_IMAGE_MAX_PIXELS', 40_000_000)
+
+
+def get_probe_bytes():
+    return getattr(settings, 'BLOG_IMAGE_PROBE_BYTES', 256 * 1024)
+
+
+def too_big_error():
+    return (
+        'Файл слишком большой: допускается не больше '
+        f'{filesizeformat(get_max_bytes())}.'
+    )
+
+
+def too_many_pixels_error():
+    max_pixels = f'{get_max_pixels():,}'.replace(',', ' ')
+    return (
+        'Изображение слишком большое: допускается не больше '
+        f'{max_pixels} пикселей.'
+    )
+
+
+def not_an_image_error():
+    return forms.ImageField.default_error_messages['invalid_image']
+
+
+def probe_size(head):
+    """
+    (width, height) по началу файла или None, если данных мало.
+
+    Image.open ленив: читает заголовок и не трогает пиксели.
+    Картинки, от которых отказывается сам Pillow, вызывают
+    Image.DecompressionBombError.
+    """
+    try:
+        with Image.open(BytesIO(head)) as image:
+            return image.size
+    except PROBE_ERRORS:
+        return None
+
+
+class RejectedUpload(UploadedFile):
+    """Заглушка вместо отклонённого файла, error — текст для формы."""
+
+    def __init__(self, name, content_type, size, error):
+        super().__init__(
+            file=BytesIO(), name=name, content_type=content_type, size=size
+        )
+        self.error = error
+
+
+class ImageUploadLimitHandler(FileUploadHandler):
+    """Отклоняет слишком тяжёлые или слишком большие изображения."""
+
+    field_names = ('image',)
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.active = self.field_name in self.field_names
+        self.received = 0
+        self.head = bytearray()
+        self.size = None
+        self.error = None
+        if not self.active:
+            return
+        if self.content_length and self.content_length > get_max_bytes():
+            self.stop_upload()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        self.received += len(raw_data)
+        if self.received > get_max_bytes():
+            self.stop_upload()
+        if self.error:
+            return None
+        if self.size is None:
+            self.probe(raw_data)
+            if self.error:
+                return None
+        return raw_data
+
+    def stop_upload(self):
+        """Файл больше лимита: остаток тела запроса не читаем."""
+        if self.request is not None:
+            self.request.upload_limit_error = too_big_error()
+        raise StopUpload(connection_reset=True)
+
+    def probe(self, raw_data):
+        self.head += raw_data[:get_probe_bytes() - len(self.head)]
+        try:
+            size = probe_size(bytes(self.head))
+        except Image.DecompressionBombError:
+            self.error = too_many_pixels_error()
+            return
+        if size is None:
+            if len(self.head) >= get_probe_bytes():
+                self.error = not_an_image_error()
+            return
+        self.size = size
+        self.head = None
+        width, height = size
+        if width * height > get_max_pixels():
+            self.error = too_many_pixels_error()
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        if self.error is None and self.size is None:
+            self.error = not_an_image_error()
+        if self.error is None:
+            return None
+        return RejectedUpload(
+            self.file_name, self.content_type, self.received, self.error
+        )
+
+
+def get_upload_error(request):
+    """Текст ошибки, если ImageUploadLimitHandler прервал загрузку."""
+    return getattr(request, 'upload_limit_error', None)
+
+
+def limit_image_uploads(view):
+    """
+    Декоратор view: ставит ImageUploadLimitHandler на этот запрос.
+
+    Обработчики нельзя менять после чтения request.POST, а
+    CsrfViewMiddleware читает его до view, поэтому проверка CSRF
+    переносится внутрь (как в документации Django к upload handlers).
+    """
+    protected_view = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers.insert(0, ImageUploadLimitHandler(request))
+        if request.method == 'POST':
+            # Разбор тела запроса; прерванная загрузка — сразу 413.
+            request.FILES
+            error = get_upload_error(request)
+            if error:
+                return HttpResponse(
+                    error, status=413, content_type='text/plain; charset=utf-8'
+                )
+        return protected_view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class LimitedImageField(forms.ImageField):
+    """
+    ImageField, понимающий RejectedUpload.
+
+    Лимиты проверяются и здесь — для файлов, пришедших в обход
+    ImageUploadLimitHandler (например, в тестах или из кода).
+    """
+
+    def to_python(self, data):
+        if isinstance(data, RejectedUpload):
+            raise forms.ValidationError(data.error, code='upload_limit')
+        if data and getattr(data, 'size', None) and (
+            data.size > get_max_bytes()
+        ):
+            raise forms.ValidationError(too_big_error(), code='upload_limit')
+        result = super().to_python(data)
+        image = getattr(result, 'image', None)
+        if image is not None:
+            width, height = image.size
+            if width * height > get_max_pixels():
+                raise forms.ValidationError(
+                    too_many_pixels_error(), code='upload_limit'
+                )
+        return result
@@ -25,6 +25,8 @@ urlpatterns = [
         name='category_posts'
     ),
     path('posts/create/', views.post_create, name='create_post'),
+    path('search/', views.search_posts, name='search'),
+    path('export/<str:kind>/', views.export_data, name='export'),
     path('profile/edit/', views.edit_profile, name='edit_profile'),
     path('profile/<str:username>/', views.user_posts, name='profile'),
 ]
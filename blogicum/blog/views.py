@@ -1,43 +1,87 @@
-from django.shortcuts import render
 from .models import Post, Category
 from django.shortcuts import render, get_object_or_404
 from django.utils import timezone
 from django.core.paginator import Paginator
 from django.contrib.auth.models import User
 from .forms import PostForm
+from .paginators import KeysetPaginator
+from .cache import anonymous_page_cache, depends_on, FEED_SCOPE, post_scope
+from .conditional import feed_condition, post_condition, profile_condition
+from .search import get_ranked_post_ids
+from .uploads import limit_image_uploads
 from django.shortcuts import redirect
 from django.contrib.auth.decorators import login_required
-from .models import Comment
+from .models import Comment, OutgoingEmail
 from .forms import CommentForm, CommentEditForm
-from django.http import HttpResponseForbidden
 from django.views.decorators.http import require_POST
 from django.contrib import messages
-from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth.forms import UserChangeForm
-from django.db.models import Count
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import StreamingHttpResponse
+from .export import EXPORTS, FORMATS, export, get_filename
+from blogicum.replicas import replica_reads
+from django.utils.http import urlencode
 from django.http import Http404, HttpResponseForbidden
-from django.contrib.auth.forms import UserChangeForm
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
 
 
-def get_page_obj(queryset, request, per_page=10):
-    """Создает объект страницы для пагинации"""
+def get_page_obj(queryset, request, per_page=10, keyset=None):
+    """
+    Создает объект страницы для пагинации.
+
+    keyset=True включает курсорную пагинацию (?cursor=...) вместо
+    номеров страниц; по умолчанию берётся BLOG_KEYSET_PAGINATION.
+    """
+    if keyset is None:
+        keyset = getattr(settings, 'BLOG_KEYSET_PAGINATION', False)
+    if keyset:
+        paginator = KeysetPaginator(queryset, per_page)
+        return paginator.get_page(request.GET.get('cursor'))
     paginator = Paginator(queryset, per_page)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
+def get_cached_feed_page_obj(queryset, request):
+    """Страница ленты, которую кеширует anonymous_page_cache."""
+    page_obj = get_page_obj(queryset, request)
+    # Карточки выводят число комментариев: кеш страницы сбросится
+    # при изменении любого из её постов.
+    depends_on(request, [post_scope(post.pk) for post in page_obj])
+    return page_obj
+
+
+def index_feed(request):
+    """Посты главной ленты (без JOIN-ов и сортировки карточек)"""
+    return Post.objects.published()
+
+
+def category_feed(request, category_slug):
+    """Посты ленты категории"""
+    return Post.objects.published().filter(category__slug=category_slug)
+
+
+def profile_feed(request, username):
+    """Посты профиля: автор видит и неопубликованные"""
+    posts = Post.objects.filter(author__username=username)
+    if request.user.get_username() != username:
+        posts = posts.published()
+    return posts
+
+
+@replica_reads
+@feed_condition(index_feed)
+@anonymous_page_cache(lambda: [FEED_SCOPE])
 def index(request):
     """Главная страница со списком постов"""
-    post_list = Post.objects.filter(
-        is_published=True,
-        pub_date__lte=timezone.now(),
-        category__is_published=True
-    ).with_comments_count().order_by('-pub_date')
+    post_list = index_feed(request).for_feed()
 
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = get_cached_feed_page_obj(post_list, request)
 
     context = {
         'title': 'Лента записей',
@@ -46,10 +90,16 @@ def index(request):
     return render(request, 'blog/index.html', context)
 
 
+@replica_reads
+@post_condition
+@anonymous_page_cache(lambda id: [post_scope(id)])
 def post_detail(request, id):
     """Страница отдельного поста"""
+    # Странице нужен только готовый HTML текста (Post.text_html).
     post = get_object_or_404(
-        Post.objects.select_related('category', 'location', 'author'),
+        Post.objects.select_related(
+            'category', 'location', 'author'
+        ).defer('text'),
         id=id
     )
 
@@ -69,6 +119,7 @@ def post_detail(request, id):
         comments = post.comments.filter(
             is_published=True
         ).select_related('author')
+    comments = comments.defer('text')
 
     comment_form = CommentForm()
 
@@ -81,6 +132,9 @@ def post_detail(request, id):
     return render(request, 'blog/detail.html', context)
 
 
+@replica_reads
+@feed_condition(category_feed)
+@anonymous_page_cache(lambda category_slug: [FEED_SCOPE])
 def category_posts(request, category_slug):
     """Страница категории"""
     category = get_object_or_404(
@@ -89,15 +143,9 @@ def category_posts(request, category_slug):
         is_published=True
     )
 
-    posts = Post.objects.filter(
-        category=category,
-        is_published=True,
-        pub_date__lte=timezone.now()
-    ).with_comments_count().order_by('-pub_date')
+    posts = category_feed(request, category_slug).for_feed()
 
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = get_cached_feed_page_obj(posts, request)
 
     context = {
         'title': f'Категория: {category.title}',
@@ -107,22 +155,14 @@ def category_posts(request, category_slug):
     return render(request, 'blog/category.html', context)
 
 
+@replica_reads
+@profile_condition(profile_feed)
 def user_posts(request, username):
     user = get_object_or_404(User, username=username)
 
-    if request.user == user:
-        posts = Post.objects.filter(author=user).with_comments_count().order_by('-pub_date')
-    else:
-        posts = Post.objects.filter(
-            author=user,
-            is_published=True,
-            pub_date__lte=timezone.now(),
-            category__is_published=True
-        ).with_comments_count().order_by('-pub_date')
-
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts = profile_feed(request, username).for_feed()
+
+    page_obj = get_page_obj(posts, request)
 
     context = {
         'profile': user,
@@ -132,7 +172,28 @@ def user_posts(request, username):
     return render(request, 'blog/profile.html', context)
 
 
+def search_posts(request):
+    """Поиск по заголовкам и текстам постов и комментариям"""
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        page_obj = get_page_obj(
+            get_ranked_post_ids(query), request, keyset=False
+        )
+        posts = Post.objects.for_feed().in_bulk(page_obj.object_list)
+        page_obj.object_list = [posts[pk] for pk in page_obj.object_list]
+
+    context = {
+        'title': 'Поиск',
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'blog/search.html', context)
+
+
 @login_required
+@limit_image_uploads
 def post_create(request):
     """Создание новой публикации"""
     if request.method == 'POST':
@@ -157,7 +218,12 @@ def post_create(request):
 
 
 def send_post_created_email(user, post):
-    """Отправка письма о создании поста"""
+    """
+    Отправка письма о создании поста.
+
+    Письмо ставится в очередь и уходит воркером send_outbox,
+    поэтому сбой почтового сервера не ломает создание поста.
+    """
     subject = f'Ваш пост "{post.title}" опубликован!'
     message = f'''
     Здравствуйте, {user.username}!
@@ -171,16 +237,11 @@ def send_post_created_email(user, post):
     Команда Blogicum
     '''
 
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        fail_silently=False,
-    )
+    OutgoingEmail.enqueue(subject, message, [user.email])
 
 
 @login_required
+@limit_image_uploads
 def post_edit(request, id):
     """Редактирование существующей публикации"""
     post = get_object_or_404(Post, id=id)
@@ -334,7 +395,7 @@ def delete_comment_confirm(request, id, comment_id):
 
 
 def send_welcome_email(user):
-    """Отправка приветственного письма новому пользователю"""
+    """Отправка приветственного письма новому пользователю (через очередь)"""
     subject = 'Добро пожаловать в Blogicum!'
     message = f'''
     Здравствуйте, {user.username}!
@@ -350,13 +411,7 @@ def send_welcome_email(user):
     Команда Blogicum
     '''
 
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        fail_silently=False,
-    )
+    OutgoingEmail.enqueue(subject, message, [user.email])
 
 
 @login_required
@@ -371,3 +426,24 @@ def edit_profile(request):
         form = UserChangeForm(instance=request.user)
 
     return render(request, 'registration/profile_edit.html', {'form': form})
+
+
+@staff_member_required
+def export_data(request, kind):
+    """Выгрузка постов или комментариев потоком: ?format=csv&gzip=1."""
+    if kind not in EXPORTS:
+        raise Http404
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in FORMATS:
+        export_format = 'ndjson'
+    compress = request.GET.get('gzip') == '1'
+    response = StreamingHttpResponse(
+        export(kind, export_format, compress=compress),
+        content_type=(
+            'application/gzip' if compress
+            else EXPORT_CONTENT_TYPES[export_format]
+        ),
+    )
+    filename = get_filename(kind, export_format, compress)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
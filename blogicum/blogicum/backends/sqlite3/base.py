@@ -0,0 +1,90 @@
+"""
+SQLite с настройками для работы под нагрузкой.
+
+Стандартный бэкенд открывает файл в режиме rollback journal: пишущий
+запрос (post_create, add_comment) блокирует всех читателей, а при
+занятой базе читатель сразу получает «database is locked». Здесь
+при каждом подключении выставляются PRAGMA:
+
+* journal_mode=WAL — читатели не ждут писателя и наоборот;
+* synchronous=NORMAL — в WAL это безопасно при падении процесса,
+  а fsync идёт только на checkpoint;
+* mmap_size и cache_size — чтение страниц без лишних копий;
+* busy_timeout — писатель ждёт другого писателя, а не падает.
+
+journal_mode, в отличие от остальных, — свойство самого файла базы:
+включение WAL переписывает его заголовок и создаёт рядом -wal и -shm.
+Поэтому он ставится не при подключении, а при первом HTTP-запросе
+процесса (сигнал request_started): manage.py check, makemigrations
+--check и прочие команды оставляют файл как есть.
+
+Транзакции atomic() открываются BEGIN IMMEDIATE: отложенная
+транзакция, которая сначала читает, а потом пишет, не может дождаться
+блокировки в WAL и сразу получает SQLITE_BUSY.
+
+Значения по умолчанию — PRAGMAS ниже; переопределяются через
+DATABASES[...]['OPTIONS']['pragmas'] и ['transaction_mode'].
+"""
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.sqlite3 import base
+from django.dispatch import receiver
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # 256 МиБ адресного пространства, не памяти.
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — в КиБ: 64 МиБ кеша страниц.
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+# Ставит enable_journal_mode; до первого запроса journal_mode не трогаем.
+serving_requests = False
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # Свои ключи OPTIONS не должны попасть в sqlite3.connect().
+        self.pragmas = {**PRAGMAS, **kwargs.pop('pragmas', {})}
+        self.transaction_mode = kwargs.pop('transaction_mode', 'IMMEDIATE')
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            if name != 'journal_mode' or serving_requests:
+                conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def apply_journal_mode(self):
+        """Ставит journal_mode уже открытому соединению."""
+        journal_mode = self.pragmas.get('journal_mode')
+        # Внутри транзакции SQLite не переключает режим журнала;
+        # тогда режим поставит следующее соединение.
+        if journal_mode is None or self.in_atomic_block:
+            return
+        with self.cursor() as cursor:
+            cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        else:
+            super()._start_transaction_under_autocommit()
+
+
+@receiver(request_started)
+def enable_journal_mode(**kwargs):
+    """Первый HTTP-запрос процесса: дальше соединения открываются в WAL."""
+    global serving_requests
+    if serving_requests:
+        return
+    serving_requests = True
+    for conn in connections.all():
+        if isinstance(conn, DatabaseWrapper) and conn.connection is not None:
+            conn.apply_journal_mode()
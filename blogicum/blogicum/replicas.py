@@ -0,0 +1,142 @@
+"""
+Чтение с реплик, запись в основную базу.
+
+Реплики — алиасы из DATABASES, перечисленные в DATABASE_REPLICAS;
+они содержат копию default и сами не мигрируются. Роутер отправляет
+на реплику только чтения внутри use_replicas() — его включают
+декоратор replica_reads у лент и страниц постов и ReplicaReadMixin
+у API. Всё остальное, в том числе чтения внутри atomic() и внутри
+use_primary() (им кеш страниц строит ответы, которые положит в кеш),
+идёт в default.
+
+Чтобы пользователь сразу видел свой пост или комментарий, хотя
+реплика ещё не догнала основную базу, ReadYourWritesMiddleware после
+запроса с записью ставит cookie: пока она жива, все чтения этого
+браузера идут в default. Время жизни — DATABASE_REPLICA_STICKY_SECONDS,
+оно должно быть больше отставания реплик.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_COOKIE = 'use_primary'
+SAFE_METHODS = ('GET', 'HEAD')
+
+# Реплика, выбранная для текущего запроса; None — читать из default.
+current_replica = ContextVar('current_replica', default=None)
+# {'wrote': bool} для текущего запроса; ставит middleware.
+current_writes = ContextVar('current_writes', default=None)
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def get_sticky_seconds():
+    return getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 10)
+
+
+def should_use_replicas(request):
+    return bool(
+        get_replicas()
+        and request.method in SAFE_METHODS
+        and STICKY_COOKIE not in request.COOKIES
+    )
+
+
+@contextmanager
+def use_replicas(request):
+    """Чтения внутри блока идут на одну из реплик, если это безопасно."""
+    if not should_use_replicas(request):
+        yield
+        return
+    # Одна реплика на весь запрос: счётчик страниц и сами строки
+    # должны прийти из одного снимка.
+    token = current_replica.set(random.choice(get_replicas()))
+    try:
+        yield
+    finally:
+        current_replica.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """
+    Чтения внутри блока идут в default, даже внутри use_replicas().
+
+    Для ответов, которые переживут запрос (кеш страниц): отставшая
+    реплика попала бы в кеш на весь его TTL.
+    """
+    token = current_replica.set(None)
+    try:
+        yield
+    finally:
+        current_replica.reset(token)
+
+
+def replica_reads(view):
+    """Декоратор view: безопасные запросы читают с реплики."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with use_replicas(request):
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replica = current_replica.get()
+        if replica is None:
+            return DEFAULT_DB_ALIAS
+        # Внутри транзакции читаем то, что в ней же и записали.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        writes = current_writes.get()
+        if writes is not None:
+            writes['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными из default.
+        if db in get_replicas():
+            return False
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """Ставит cookie «читать из default» после запроса с записью."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = {'wrote': False}
+        token = current_writes.set(writes)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_writes.reset(token)
+        if writes['wrote'] and get_replicas():
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=get_sticky_seconds(),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
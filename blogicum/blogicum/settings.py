@@ -27,11 +27,16 @@ INSTALLED_APPS = [
     'rest_framework',
     'djoser',
     'django_filters',
+    'monitoring',
     # 'api',  ← закомментируй или удали
 ]
 
 
 MIDDLEWARE = [
+    # Первым, чтобы учитывать время и запросы всех остальных.
+    'monitoring.middleware.RequestMetricsMiddleware',
+    'monitoring.profiler.SamplingProfilerMiddleware',
+    'blogicum.replicas.ReadYourWritesMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -45,10 +50,18 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с замером времени рендеринга.
+        'BACKEND': 'monitoring.templates.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Шаблоны разбираются один раз на процесс и при DEBUG тоже:
+            # runserver сбрасывает кеш загрузчика при правке шаблона.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -63,11 +76,45 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # WAL, PRAGMA и BEGIN IMMEDIATE — см. blogicum/backends/sqlite3.
+        'ENGINE': 'blogicum.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение живёт между запросами, а не открывается заново.
+        'CONN_MAX_AGE': 600,
     }
 }
 
+# Реплики только для чтения: пути к копиям базы через запятую
+# (локально их обновляет manage.py sync_replicas).
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+    filter(None, os.environ.get('BLOGICUM_DB_REPLICAS', '').split(',')), 1
+):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['blogicum.replicas.PrimaryReplicaRouter']
+# Сколько секунд после записи пользователь читает из default.
+DATABASE_REPLICA_STICKY_SECONDS = 10
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Готовые карточки постов ({% cache %} в includes/post_card.html):
+    # тег сам берёт этот кеш, и карточки не вытесняют страницы.
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'template-fragments',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME':
@@ -123,8 +170,107 @@ EMAIL_USE_SSL = False
 DEFAULT_FROM_EMAIL = 'blogicum@example.com'
 SERVER_EMAIL = 'blogicum@example.com'
 
+# Очередь писем (blog.outbox, manage.py send_outbox).
+BLOG_OUTBOX_MAX_ATTEMPTS = 5
+BLOG_OUTBOX_RETRY_DELAY = 60
+BLOG_OUTBOX_MAX_RETRY_DELAY = 60 * 60
+# На сколько секунд воркер захватывает пачку перед отправкой.
+BLOG_OUTBOX_CLAIM_TIMEOUT = 10 * 60
+
 LOGIN_URL = '/auth/login/'
 
+# Курсорная пагинация лент вместо ?page=N: глубокие страницы
+# стоят столько же, сколько первая, и не требуют COUNT(*).
+BLOG_KEYSET_PAGINATION = False
+
+# Кеш страниц для анонимных посетителей (blog.cache), в секундах.
+# Сбрасывается сигналами; до отложенной публикации живёт не дольше,
+# чем до момента её выхода.
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Сколько лучших совпадений полнотекстового поиска (blog.search)
+# учитывается при выдаче.
+BLOG_SEARCH_MAX_RESULTS = 500
+
+# Уменьшенные копии изображений постов (blog.images,
+# manage.py generate_image_variants): ширины в пикселях и качество.
+BLOG_IMAGE_WIDTHS = (320, 640, 1280)
+BLOG_IMAGE_QUALITY = 80
+# manage.py sweep_images: файлы без ссылок удаляются, если к ним
+# не обращались дольше стольких секунд.
+BLOG_IMAGE_SWEEP_GRACE = 60 * 60
+
+# Лимиты на загружаемые изображения постов (blog.uploads): проверяются
+# по ходу загрузки, до того как файл целиком окажется на сервере.
+BLOG_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+BLOG_IMAGE_MAX_PIXELS = 40_000_000
+
+# Метрики запросов (monitoring): Server-Timing, лог
+# monitoring.requests и гистограммы на /monitoring/metrics/.
+MONITORING_ENABLED = True
+
+# Каталог журналов и профилей мониторинга (в .gitignore);
+# на сервере — BLOGICUM_LOG_DIR вне каталога с кодом.
+MONITORING_LOG_DIR = Path(
+    os.environ.get('BLOGICUM_LOG_DIR', BASE_DIR / 'logs')
+)
+MONITORING_LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+# Журнал медленных SQL-запросов (monitoring.slow_queries):
+# порог в миллисекундах (None — выключено), писать ли параметры,
+# раз во сколько секунд писать сводку и куда.
+# Отчёт: manage.py slow_queries.
+MONITORING_SLOW_QUERY_MS = 200
+MONITORING_SLOW_QUERY_PARAMS = True
+MONITORING_SLOW_QUERY_REPORT_SECONDS = 60
+MONITORING_SLOW_QUERY_LOG = MONITORING_LOG_DIR / 'slow_queries.log'
+
+# Выборочный профайлер (monitoring.profiler): какие views (имена URL),
+# какую долю их запросов и с каким шагом, в секундах, профилировать.
+# Пустой список — профайлер выключен. Свёрнутые стеки для flamegraph
+# пишутся в MONITORING_PROFILE_DIR.
+MONITORING_PROFILE_VIEWS = []
+MONITORING_PROFILE_RATE = 0.01
+MONITORING_PROFILE_INTERVAL = 0.005
+MONITORING_PROFILE_DIR = MONITORING_LOG_DIR / 'profiles'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {
+            'format': '%(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': MONITORING_SLOW_QUERY_LOG,
+            'maxBytes': 5 * 1024 * 1024,
+            'backupCount': 3,
+            'encoding': 'utf-8',
+            'formatter': 'message',
+            # Файл создаётся при первой записи.
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'monitoring': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'monitoring.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -7,6 +7,7 @@ from users.views import RegistrationView, ProfileEditView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('monitoring/', include('monitoring.urls')),
     path('', include('blog.urls')),
     path('', include('pages.urls')),
     path('pages/', include('pages.urls')),
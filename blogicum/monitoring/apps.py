@@ -0,0 +1,25 @@
+import atexit
+
+from django.apps import AppConfig
+from django.core.signals import request_finished
+from django.db.backends.signals import connection_created
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+    verbose_name = 'Мониторинг'
+
+    def ready(self):
+        from . import slow_queries
+
+        connection_created.connect(
+            slow_queries.install, dispatch_uid='monitoring_slow_queries'
+        )
+        # Сводка медленных запросов пишется раз в окно: проверяем
+        # после каждого запроса и дописываем остаток при выходе.
+        request_finished.connect(
+            slow_queries.flush_if_due,
+            dispatch_uid='monitoring_slow_queries_report',
+        )
+        atexit.register(slow_queries.stats.flush)
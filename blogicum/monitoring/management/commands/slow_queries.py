@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from monitoring.slow_queries import aggregate, get_report_paths, read_report
+
+SORT_KEYS = {
+    'total': 'total_ms',
+    'count': 'count',
+    'max': 'max_ms',
+}
+
+
+class Command(BaseCommand):
+    help = 'Показывает самые тяжёлые запросы из журнала медленных запросов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=10,
+            help='Сколько запросов показать.'
+        )
+        parser.add_argument(
+            '--sort', choices=sorted(SORT_KEYS), default='total',
+            help='Сортировка: суммарное время, число или худшее время.'
+        )
+        parser.add_argument(
+            '--file', default=None,
+            help='Журнал (по умолчанию MONITORING_SLOW_QUERY_LOG); '
+            'ротированные копии file.1, file.2, … читаются тоже.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.MONITORING_SLOW_QUERY_LOG
+        offenders = aggregate(read_report(get_report_paths(path)))
+        if not offenders:
+            self.stdout.write('Медленных запросов не записано.')
+            return
+        offenders.sort(key=lambda o: o[SORT_KEYS[options['sort']]],
+                       reverse=True)
+        for number, offender in enumerate(
+            offenders[:options['limit']], start=1
+        ):
+            worst = offender['worst']
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{number}. {offender['fingerprint']}: "
+                f"{offender['count']} раз, всего "
+                f"{offender['total_ms']:.1f} мс, в среднем "
+                f"{offender['total_ms'] / offender['count']:.1f} мс, "
+                f"худший {offender['max_ms']:.1f} мс"
+            ))
+            self.stdout.write(f"   {offender['sql']}")
+            for origin, count in sorted(
+                offender['origins'].items(), key=lambda item: -item[1]
+            ):
+                self.stdout.write(f'   ← {origin} ({count})')
+            if worst.get('params') is not None:
+                self.stdout.write(f"   параметры худшего: {worst['params']}")
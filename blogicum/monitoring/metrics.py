@@ -0,0 +1,143 @@
+"""
+Метрики запросов, собранные в памяти процесса.
+
+RequestMetrics копит показатели одного запроса, пока он
+обрабатывается: текущий экземпляр лежит в contextvar, куда его
+кладёт monitoring.middleware, а дописывают обёртка запросов к БД
+и шаблонный backend (monitoring.templates).
+
+registry собирает их в гистограммы по имени view. У каждого
+процесса (воркера gunicorn) свои гистограммы; они живут до
+перезапуска и читаются staff-эндпоинтом monitoring:metrics.
+"""
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+# Верхние границы корзин гистограмм; последняя корзина — «больше».
+TIME_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (
+    1024, 4 * 1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024,
+    4 * 1024 * 1024,
+)
+
+HISTOGRAMS = (
+    # (поле RequestMetrics, корзины)
+    ('duration_ms', TIME_BUCKETS_MS),
+    ('db_ms', TIME_BUCKETS_MS),
+    ('template_ms', TIME_BUCKETS_MS),
+    ('queries', QUERY_BUCKETS),
+    ('response_bytes', SIZE_BUCKETS),
+)
+
+
+class RequestMetrics:
+    """Показатели одного запроса."""
+
+    __slots__ = (
+        'started', 'duration_ms', 'queries', 'db_ms', 'template_ms',
+        'template_depth', 'response_bytes',
+    )
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.duration_ms = 0.0
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.response_bytes = None
+
+    def finish(self):
+        self.duration_ms = (perf_counter() - self.started) * 1000
+
+
+class QueryTimer:
+    """Обёртка для connection.execute_wrapper: считает запросы и время."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.metrics.queries += 1
+            self.metrics.db_ms += (perf_counter() - start) * 1000
+
+
+class Histogram:
+    """Счётчики по корзинам, сумма и максимум наблюдений."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def observe(self, value):
+        index = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'avg': round(self.sum / self.count, 3) if self.count else 0,
+            'max': round(self.max, 3),
+            'buckets': [
+                {'le': bound, 'count': count}
+                for bound, count in zip(
+                    (*self.bounds, None), self.counts
+                )
+            ],
+        }
+
+
+class MetricsRegistry:
+    """Гистограммы по view; потокобезопасен."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def observe(self, view_name, metrics):
+        with self.lock:
+            histograms = self.views.get(view_name)
+            if histograms is None:
+                histograms = self.views[view_name] = {
+                    name: Histogram(bounds) for name, bounds in HISTOGRAMS
+                }
+            for name, histogram in histograms.items():
+                value = getattr(metrics, name)
+                if value is not None:
+                    histogram.observe(value)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view_name: {
+                    name: histogram.as_dict()
+                    for name, histogram in histograms.items()
+                }
+                for view_name, histograms in sorted(self.views.items())
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,91 @@
+"""
+Middleware с метриками запроса.
+
+Для каждого запроса считает число SQL-запросов и их суммарное время
+(по всем базам), время рендеринга шаблонов, общее время и размер
+ответа. Результат:
+
+* заголовок Server-Timing — виден во вкладке Network браузера;
+* строка в логгере monitoring.requests (поля продублированы в extra);
+* гистограммы по имени view в monitoring.metrics.registry.
+
+При MONITORING_ENABLED = False middleware отключается целиком
+(MiddlewareNotUsed) и ничего не стоит.
+"""
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import QueryTimer, RequestMetrics, current_metrics, registry
+
+logger = logging.getLogger('monitoring.requests')
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED_VIEW
+    return match.view_name
+
+
+def get_response_size(response):
+    if response.streaming:
+        return None
+    return len(response.content)
+
+
+def format_server_timing(metrics):
+    return ', '.join((
+        f'db;dur={metrics.db_ms:.1f};desc="{metrics.queries} queries"',
+        f'tpl;dur={metrics.template_ms:.1f}',
+        f'total;dur={metrics.duration_ms:.1f}',
+    ))
+
+
+class RequestMetricsMiddleware:
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'MONITORING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                timer = QueryTimer(metrics)
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        metrics.finish()
+        metrics.response_bytes = get_response_size(response)
+
+        view_name = get_view_name(request)
+        registry.observe(view_name, metrics)
+        response['Server-Timing'] = format_server_timing(metrics)
+        logger.info(
+            'view=%s method=%s status=%s queries=%d db_ms=%.1f '
+            'template_ms=%.1f duration_ms=%.1f bytes=%s',
+            view_name, request.method, response.status_code,
+            metrics.queries, metrics.db_ms, metrics.template_ms,
+            metrics.duration_ms, metrics.response_bytes,
+            extra={
+                'view': view_name,
+                'method': request.method,
+                'status': response.status_code,
+                'queries': metrics.queries,
+                'db_ms': round(metrics.db_ms, 3),
+                'template_ms': round(metrics.template_ms, 3),
+                'duration_ms': round(metrics.duration_ms, 3),
+                'response_bytes': metrics.response_bytes,
+            },
+        )
+        return response
@@ -0,0 +1,136 @@
+"""
+Выборочный профайлер горячих views.
+
+SamplingProfilerMiddleware профилирует долю MONITORING_PROFILE_RATE
+запросов к views из MONITORING_PROFILE_VIEWS (имена URL, например
+'blog:index'). Пока такой запрос обрабатывается, фоновый поток
+каждые MONITORING_PROFILE_INTERVAL секунд снимает стек потока
+запроса (sys._current_frames) — сам код запроса не замедляется
+трассировкой каждого вызова.
+
+Стеки дописываются в MONITORING_PROFILE_DIR в «свёрнутом» формате
+(collapsed stacks), который понимают flamegraph.pl, speedscope
+и inferno:
+
+    main (manage.py:7);…;index (blog/views.py:93);render (…) 12
+
+Один файл на view и день: blog.index-2024-05-01.collapsed.
+Одинаковые стеки из разных запросов инструменты складывают сами.
+"""
+import os
+import random
+import sys
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+
+def get_target_views():
+    return set(getattr(settings, 'MONITORING_PROFILE_VIEWS', ()))
+
+
+def get_rate():
+    return getattr(settings, 'MONITORING_PROFILE_RATE', 0.01)
+
+
+def get_interval():
+    return getattr(settings, 'MONITORING_PROFILE_INTERVAL', 0.005)
+
+
+def format_frame(frame, base_dir):
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(base_dir):
+        filename = os.path.relpath(filename, base_dir)
+    # Номер первой строки функции, а не текущей: так все выборки
+    # одной функции складываются в один прямоугольник.
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+def collapse_stack(frame, base_dir):
+    stack = []
+    while frame is not None:
+        stack.append(format_frame(frame, base_dir))
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+class StackSampler(threading.Thread):
+    """Поток, снимающий стек thread_id раз в interval секунд."""
+
+    def __init__(self, thread_id, interval, base_dir):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.base_dir = base_dir
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame, self.base_dir)] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return self.stacks
+
+
+def get_profile_path(view_name):
+    directory = str(settings.MONITORING_PROFILE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    filename = view_name.replace(':', '.').replace(os.sep, '_')
+    return os.path.join(
+        directory, f'{filename}-{timezone.localdate()}.collapsed'
+    )
+
+
+def write_stacks(view_name, stacks):
+    if not stacks:
+        return
+    data = ''.join(
+        f'{stack} {count}\n' for stack, count in stacks.items()
+    )
+    # Один вызов write в режиме append: строки разных процессов
+    # не перемешиваются.
+    with open(get_profile_path(view_name), 'a', encoding='utf-8') as file:
+        file.write(data)
+
+
+class SamplingProfilerMiddleware:
+
+    def __init__(self, get_response):
+        self.target_views = get_target_views()
+        if not self.target_views or get_rate() <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.base_dir = os.path.abspath(str(settings.BASE_DIR))
+
+    def get_target_view(self, request):
+        if random.random() >= get_rate():
+            return None
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return None
+        return view_name if view_name in self.target_views else None
+
+    def __call__(self, request):
+        view_name = self.get_target_view(request)
+        if view_name is None:
+            return self.get_response(request)
+
+        sampler = StackSampler(
+            threading.get_ident(), get_interval(), self.base_dir
+        )
+        sampler.start()
+        try:
+            return self.get_response(request)
+        finally:
+            write_stacks(view_name, sampler.stop())
@@ -0,0 +1,295 @@
+"""
+Журнал медленных SQL-запросов.
+
+SlowQueryRecorder ставится в execute_wrappers каждого соединения
+с БД (сигнал connection_created, см. MonitoringConfig.ready) и
+ловит запросы дольше MONITORING_SLOW_QUERY_MS — в views, API,
+management-командах и воркерах.
+
+Запросы не пишутся по одному: SlowQueryStats сводит их по fingerprint
+(хеш SQL без литералов) в памяти процесса и раз
+в MONITORING_SLOW_QUERY_REPORT_SECONDS (а также в конце работы
+процесса) пишет по одной JSON-строке на fingerprint в логгер
+monitoring.slow_queries (в settings.LOGGING он пишет в ротируемый
+файл MONITORING_SLOW_QUERY_LOG):
+
+    {"fingerprint": "9b1c…", "sql": "SELECT … WHERE id = %s",
+     "count": 17, "total_ms": 9120.5, "max_ms": 812.4,
+     "example": "SELECT … WHERE id = %s", "params": "(42,)",
+     "origin": "blog/views.py:57 in index",
+     "origins": {"blog/views.py:57 in index": 17},
+     "database": "default", "since": "2024-05-01T12:00:00+00:00",
+     "time": "2024-05-01T12:01:00+00:00"}
+
+example, params и origin — у самого долгого запроса окна; SQL
+пишется как его выполнил Django, с плейсхолдерами, а параметры
+отдельно. manage.py slow_queries сводит строки всех окон в отчёт.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from time import monotonic, perf_counter
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger('monitoring.slow_queries')
+
+MAX_PARAMS_LENGTH = 500
+MAX_SQL_LENGTH = 4000
+# Границы сводки в памяти: при переполнении окно пишется досрочно.
+MAX_FINGERPRINTS = 500
+MAX_ORIGINS = 20
+OTHER_ORIGINS = 'другие'
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST_RE = re.compile(r'\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)')
+SPACE_RE = re.compile(r'\s+')
+
+MONITORING_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def normalize_sql(sql):
+    """SQL без литералов: строки и числа → ?, IN (?, ?, …) → IN (...)."""
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = PLACEHOLDER_LIST_RE.sub('(...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def get_fingerprint(normalized_sql):
+    return hashlib.md5(normalized_sql.encode()).hexdigest()[:16]
+
+
+def get_origin(base_dir=None):
+    """
+    «файл:строка in функция» — ближайший кадр из кода проекта.
+
+    Кадры Django, библиотек (site-packages) и самого monitoring
+    пропускаются.
+    """
+    base_dir = os.path.abspath(str(base_dir or settings.BASE_DIR))
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if (
+            filename.startswith(base_dir)
+            and not filename.startswith(MONITORING_DIR)
+            and 'site-packages' not in filename
+        ):
+            return (
+                f'{os.path.relpath(filename, base_dir)}:{frame.f_lineno}'
+                f' in {frame.f_code.co_name}'
+            )
+        frame = frame.f_back
+    return None
+
+
+def format_params(params):
+    if not getattr(settings, 'MONITORING_SLOW_QUERY_PARAMS', True):
+        return None
+    text = repr(params)
+    if len(text) > MAX_PARAMS_LENGTH:
+        text = text[:MAX_PARAMS_LENGTH] + '…'
+    return text
+
+
+def get_report_seconds():
+    return getattr(settings, 'MONITORING_SLOW_QUERY_REPORT_SECONDS', 60)
+
+
+class SlowQueryStats:
+    """
+    Сводка медленных запросов процесса за текущее окно.
+
+    Общая для всех соединений и потоков; не больше MAX_FINGERPRINTS
+    запросов и MAX_ORIGINS мест вызова у каждого.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.offenders = {}
+        self.started = monotonic()
+        self.since = timezone.now()
+
+    def add(self, sql, params, duration_ms, origin, database):
+        normalized = normalize_sql(sql)
+        fingerprint = get_fingerprint(normalized)
+        report = []
+        with self.lock:
+            if (
+                fingerprint not in self.offenders
+                and len(self.offenders) >= MAX_FINGERPRINTS
+            ):
+                report = self.pop_report()
+            offender = self.offenders.setdefault(fingerprint, {
+                'fingerprint': fingerprint,
+                'sql': normalized[:MAX_SQL_LENGTH],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'origins': {},
+            })
+            offender['count'] += 1
+            offender['total_ms'] += duration_ms
+            if duration_ms >= offender['max_ms']:
+                offender.update({
+                    'max_ms': duration_ms,
+                    'example': sql[:MAX_SQL_LENGTH],
+                    'params': format_params(params),
+                    'origin': origin,
+                    'database': database,
+                })
+            origins = offender['origins']
+            origin = origin or '?'
+            if origin not in origins and len(origins) >= MAX_ORIGINS:
+                origin = OTHER_ORIGINS
+            origins[origin] = origins.get(origin, 0) + 1
+            if not report and self.is_due():
+                report = self.pop_report()
+        write_report(report)
+
+    def is_due(self):
+        return monotonic() - self.started >= get_report_seconds()
+
+    def pop_report(self):
+        """Строки журнала за окно; начинает новое окно."""
+        now = timezone.now().isoformat()
+        report = [
+            {
+                **offender,
+                'total_ms': round(offender['total_ms'], 3),
+                'max_ms': round(offender['max_ms'], 3),
+                'since': self.since.isoformat(),
+                'time': now,
+            }
+            for offender in self.offenders.values()
+        ]
+        self.reset()
+        return report
+
+    def flush(self, force=True):
+        """Пишет окно в журнал: всегда или (force=False) если пора."""
+        with self.lock:
+            if not self.offenders or not (force or self.is_due()):
+                return
+            report = self.pop_report()
+        write_report(report)
+
+
+def write_report(report):
+    for entry in report:
+        logger.warning(json.dumps(entry, ensure_ascii=False))
+
+
+stats = SlowQueryStats()
+
+
+class SlowQueryRecorder:
+    """Обёртка execute_wrapper: сводит запросы дольше порога в stats."""
+
+    def __init__(self, threshold_ms, stats=stats):
+        self.threshold_ms = threshold_ms
+        self.stats = stats
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (perf_counter() - start) * 1000
+            if duration_ms >= self.threshold_ms:
+                self.stats.add(
+                    sql, params, duration_ms, get_origin(),
+                    context['connection'].alias,
+                )
+
+
+def flush_if_due(**kwargs):
+    """Обработчик request_finished: окно закрывается и без новых записей."""
+    stats.flush(force=False)
+
+
+def install(sender=None, connection=None, **kwargs):
+    """
+    Обработчик connection_created: добавляет recorder в соединение.
+
+    Вставляем в начало списка: execute_wrapper() снимает обёртки
+    с конца, а соединение может открыться внутри такого блока
+    (например, в monitoring.middleware).
+    """
+    threshold = getattr(settings, 'MONITORING_SLOW_QUERY_MS', None)
+    if threshold is None:
+        return
+    wrappers = connection.execute_wrappers
+    if any(isinstance(wrapper, SlowQueryRecorder) for wrapper in wrappers):
+        return
+    wrappers.insert(0, SlowQueryRecorder(threshold))
+
+
+def read_report(paths):
+    """Записи журнала из файлов paths; битые строки пропускаются."""
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8') as report:
+                for line in report:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            continue
+
+
+def get_report_paths(path):
+    """Файл журнала и его ротированные копии (path.1, path.2, …)."""
+    directory, name = os.path.split(os.path.abspath(str(path)))
+    if not os.path.isdir(directory):
+        return []
+    rotated = sorted(
+        (
+            entry for entry in os.listdir(directory)
+            if entry.startswith(f'{name}.') and entry[len(name) + 1:].isdigit()
+        ),
+        key=lambda entry: int(entry[len(name) + 1:]),
+        reverse=True,
+    )
+    return [os.path.join(directory, entry) for entry in rotated] + [
+        os.path.join(directory, name)
+    ]
+
+
+def aggregate(entries):
+    """
+    Сводит сводки окон (SlowQueryStats) по fingerprint: число,
+    суммарное и худшее время.
+    """
+    offenders = {}
+    for entry in entries:
+        offender = offenders.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'sql': entry['sql'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'worst': None,
+            'origins': {},
+        })
+        offender['count'] += entry['count']
+        offender['total_ms'] += entry['total_ms']
+        if entry['max_ms'] >= offender['max_ms']:
+            offender['max_ms'] = entry['max_ms']
+            offender['worst'] = entry
+        for origin, origin_count in entry['origins'].items():
+            offender['origins'][origin] = (
+                offender['origins'].get(origin, 0) + origin_count
+            )
+    return list(offenders.values())
@@ -0,0 +1,43 @@
+"""
+Шаблонный backend, замеряющий время рендеринга.
+
+Подключается в TEMPLATES вместо DjangoTemplates. Время пишется
+в текущий RequestMetrics; вне запроса или при выключенном
+мониторинге остаётся одна проверка contextvar.
+"""
+from time import perf_counter
+
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+from .metrics import current_metrics
+
+
+class Template(django_backend.Template):
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return super().render(context, request)
+        # Вложенный рендеринг (render_to_string из тега) уже
+        # входит во время внешнего шаблона.
+        metrics.template_depth += 1
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_ms += (perf_counter() - start) * 1000
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
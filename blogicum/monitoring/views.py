@@ -0,0 +1,10 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .metrics import registry
+
+
+@staff_member_required
+def metrics(request):
+    """Гистограммы метрик по view для этого процесса."""
+    return JsonResponse(registry.snapshot())
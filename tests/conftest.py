@@ -1,6 +1,8 @@
+import json
 import os
 import re
 import time
+from contextlib import contextmanager
 from http import HTTPStatus
 from inspect import getsource
 from pathlib import Path
@@ -19,17 +21,25 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
 from django.test import override_settings
 from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
 from mixer.backend.django import mixer as _mixer
 
 N_PER_FIXTURE = 3
 N_PER_PAGE = 10
 COMMENT_TEXT_DISPLAY_LEN_FOR_TESTS = 50
 
+QUERY_COUNTS_PATH = Path(__file__).parent / "query_counts.json"
+# UPDATE_QUERY_COUNTS=1 pytest ... — переписать query_counts.json
+# фактическими значениями вместо проверки.
+UPDATE_QUERY_COUNTS = bool(os.environ.get("UPDATE_QUERY_COUNTS"))
+
 KeyVal = NamedTuple("KeyVal", [("key", Optional[str]), ("val", Optional[str])])
 UrlRepr = NamedTuple("UrlRepr", [("url", str), ("repr", str)])
 TitledUrlRepr = TypeVar("TitledUrlRepr", bound=Tuple[UrlRepr, str])
@@ -41,6 +51,68 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кеш страниц и карточек не должен переживать откат БД между тестами."""
+    for backend in caches.all():
+        backend.clear()
+    yield
+
+
+@pytest.fixture(scope="session")
+def query_counts_snapshot():
+    """Ожидаемое число запросов по ключу «имя URL / клиент»."""
+    snapshot = json.loads(QUERY_COUNTS_PATH.read_text(encoding="utf-8"))
+    observed = {}
+    yield snapshot if not UPDATE_QUERY_COUNTS else observed
+    if UPDATE_QUERY_COUNTS:
+        QUERY_COUNTS_PATH.write_text(
+            json.dumps(
+                dict(sorted({**snapshot, **observed}.items())),
+                ensure_ascii=False,
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+
+
+@pytest.fixture
+def assert_query_budget(query_counts_snapshot):
+    """
+    Контекстный менеджер: запросов не больше, чем в query_counts.json.
+
+        with assert_query_budget("blog:index / anonymous"):
+            client.get("/")
+    """
+
+    @contextmanager
+    def check(key: str):
+        with CaptureQueriesContext(connection) as captured:
+            yield captured
+        actual = len(captured)
+        if UPDATE_QUERY_COUNTS:
+            query_counts_snapshot[key] = max(
+                actual, query_counts_snapshot.get(key, 0)
+            )
+            return
+        budget = query_counts_snapshot.get(key)
+        assert budget is not None, (
+            f"Добавьте `{key}` в {QUERY_COUNTS_PATH.name}"
+            " (UPDATE_QUERY_COUNTS=1 pytest ...)."
+        )
+        queries = "\n".join(
+            f"  {number}. {query['sql']}"
+            for number, query in enumerate(captured.captured_queries, 1)
+        )
+        assert actual <= budget, (
+            f"`{key}`: {actual} SQL-запросов вместо {budget} — похоже"
+            f" на N+1. Запросы:\n{queries}"
+        )
+
+    return check
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,61 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+from rest_framework.test import APIClient
+
+pytestmark = [pytest.mark.django_db]
+
+
+def comments_url(post_id):
+    return f"/api/v1/posts/{post_id}/comments/"
+
+
+def test_comments_are_cursor_paginated(
+    mixer: Mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(45).blend("blog.Comment", post=post)
+    client = APIClient()
+
+    seen, url = [], comments_url(post.id)
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.data["results"]) <= 20
+        seen += [comment["id"] for comment in response.data["results"]]
+        url = response.data["next"]
+
+    assert seen == [
+        comment.id
+        for comment in sorted(comments, key=lambda c: (c.created_at, c.id))
+    ]
+
+
+def test_missing_post_is_cheap_404():
+    with CaptureQueriesContext(connection) as queries:
+        response = APIClient().get(comments_url(10 ** 9))
+    assert response.status_code == 404
+    assert len(queries) == 1
+    assert '"blog_post"."text"' not in queries[0]["sql"], (
+        "Убедитесь, что для ответа 404 строка поста не загружается."
+    )
+
+
+def test_create_comment_looks_up_post_once(
+    user, post_with_published_location
+):
+    client = APIClient()
+    client.force_authenticate(user)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(
+            comments_url(post_with_published_location.id), {"text": "Текст"}
+        )
+    assert response.status_code == 201
+    post_lookups = [
+        query for query in queries
+        if query["sql"].startswith("SELECT") and '"blog_post"' in query["sql"]
+    ]
+    assert len(post_lookups) == 1, (
+        "Убедитесь, что при создании комментария пост ищется один раз."
+    )
@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+from rest_framework.test import APIClient
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+URL = "/api/v1/posts/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def api_posts(mixer: Mixer, user, published_category, published_location):
+    now = timezone.now()
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=(now - timedelta(days=i) for i in range(100)),
+    )
+
+
+def test_posts_are_cursor_paginated(api_client, api_posts):
+    seen = []
+    url = URL
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert len(response.data["results"]) <= N_PER_PAGE
+        seen += [post["id"] for post in response.data["results"]]
+        url = response.data["next"]
+
+    expected = sorted(
+        api_posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+    assert seen == [post.id for post in expected], (
+        "Убедитесь, что `/api/v1/posts/` отдаёт все посты по страницам"
+        " в порядке «от новых к старым»."
+    )
+
+
+def test_page_size_is_bounded(api_client, api_posts):
+    response = api_client.get(URL, {"page_size": 5})
+    assert len(response.data["results"]) == 5
+    response = api_client.get(URL, {"page_size": 10 ** 6})
+    assert len(response.data["results"]) <= 100
+
+
+def test_posts_filters(
+    mixer: Mixer, api_client, api_posts, another_user, another_category
+):
+    other = mixer.blend(
+        "blog.Post", author=another_user, category=another_category
+    )
+
+    by_author = api_client.get(URL, {"author": another_user.username})
+    assert [post["id"] for post in by_author.data["results"]] == [other.id]
+
+    by_category = api_client.get(URL, {"category": another_category.id})
+    assert [post["id"] for post in by_category.data["results"]] == [
+        other.id
+    ]
+
+    newest = max(api_posts, key=lambda post: post.pub_date)
+    by_date = api_client.get(URL, {
+        "pub_date_after": (newest.pub_date - timedelta(hours=1)).isoformat(),
+        "pub_date_before": (newest.pub_date + timedelta(hours=1)).isoformat(),
+        "author": newest.author.username,
+    })
+    assert [post["id"] for post in by_date.data["results"]] == [newest.id]
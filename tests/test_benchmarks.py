@@ -0,0 +1,41 @@
+import pytest
+
+from benchmarks import datasets, scenarios
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_benchmarks_run_on_tiny_dataset():
+    dataset = datasets.seed(n_posts=60, n_comments=datasets.HOT_POST_COMMENTS)
+    assert dataset["posts"] == 60
+    assert dataset["hot_post_comments"] == datasets.HOT_POST_COMMENTS
+
+    results = scenarios.run(dataset, repeat=2)
+
+    assert set(results) == {name for name, _, _ in scenarios.get_scenarios(
+        dataset
+    )}
+    for name, result in results.items():
+        assert result["status"] == [200], (
+            f"Убедитесь, что сценарий бенчмарка `{name}` ({result['url']})"
+            " отвечает 200."
+        )
+        assert len(result["queries"]) == 1, (
+            f"Число запросов в сценарии `{name}` не должно меняться"
+            " от прогона к прогону."
+        )
+        assert result["min_ms"] <= result["median_ms"] <= result["max_ms"]
+
+
+def test_feed_columns_benchmark():
+    from benchmarks import feed_columns
+
+    datasets.seed(n_posts=30, n_comments=0, text_words=(500, 600))
+    results = feed_columns.run(repeat=1)
+
+    assert {result["rows"] for result in results.values()} == {
+        results["all_columns"]["rows"]
+    }
+    assert (
+        results["card_fields"]["bytes"] < results["all_columns"]["bytes"] / 10
+    ), "Убедитесь, что лента не загружает полный текст длинных постов."
@@ -0,0 +1,133 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog import search
+from blog.bulkload import iter_json_objects
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / "db.json"
+
+
+def test_iter_json_objects_array_and_ndjson():
+    objects = [{"pk": number, "text": "x" * 50} for number in range(5)]
+    array = io.StringIO(json.dumps(objects, indent=2))
+    ndjson = io.StringIO("\n".join(json.dumps(obj) for obj in objects))
+    assert list(iter_json_objects(array, read_size=7)) == objects
+    assert list(iter_json_objects(ndjson, read_size=7)) == objects
+
+
+def test_iter_json_objects_reports_byte_offset():
+    # «ё» — два байта в UTF-8: второй объект начинается с 12-го байта.
+    stream = io.StringIO('{"t": "ё"}\n{"pk": 2, "text": ')
+    with pytest.raises(CommandError, match="с байта 12"):
+        list(iter_json_objects(stream, read_size=4))
+
+
+def test_iter_json_objects_limits_buffer():
+    text = '{"pk": 1}\n{"pk": 2, "text": "' + "x" * 1000
+    stream = io.StringIO(text)
+    with pytest.raises(CommandError, match="с байта 10"):
+        list(iter_json_objects(stream, read_size=4, max_object_size=50))
+    assert stream.tell() < 100, (
+        "Убедитесь, что повреждённый объект не дочитывается до конца файла."
+    )
+
+
+def test_loads_db_json(capsys):
+    expected = json.loads(DB_JSON.read_text(encoding="utf-8"))
+    expected_posts = [row for row in expected if row["model"] == "blog.post"]
+
+    call_command("bulk_loaddata", str(DB_JSON), "--batch-size", "3")
+
+    assert Post.objects.count() == len(expected_posts), (
+        "Убедитесь, что bulk_loaddata загружает все посты из фикстуры."
+    )
+    first = expected_posts[0]
+    post = Post.objects.get(pk=first["pk"])
+    assert post.created_at.isoformat().startswith(
+        first["fields"]["created_at"][:19]
+    ), "Убедитесь, что даты из фикстуры не заменяются текущим временем."
+    assert "строк/с" in capsys.readouterr().out
+
+
+def test_rebuilds_derived_data(tmp_path, mixer: Mixer, user):
+    category = mixer.blend("blog.Category", is_published=True)
+    rows = [
+        {
+            "model": "blog.post",
+            "pk": 100,
+            "fields": {
+                "title": "Загруженный пост",
+                "text": "Комета над морем",
+                "pub_date": "2022-01-01T00:00:00Z",
+                "author": user.pk,
+                "category": category.pk,
+                "is_published": True,
+            },
+        },
+    ] + [
+        {
+            "model": "blog.comment",
+            "pk": 200 + number,
+            "fields": {"text": "Отлично", "post": 100, "author": user.pk},
+        }
+        for number in range(3)
+    ]
+    fixture = tmp_path / "posts.ndjson"
+    # Комментарии идут раньше поста: внешние ключи проверяются в конце.
+    fixture.write_text(
+        "\n".join(json.dumps(row) for row in rows[::-1]), encoding="utf-8"
+    )
+
+    call_command("bulk_loaddata", str(fixture), stdout=io.StringIO())
+
+    post = Post.objects.get(pk=100)
+    assert post.comment_count == 3, (
+        "Убедитесь, что после загрузки пересчитывается comment_count."
+    )
+    assert Comment.objects.filter(post=post).count() == 3
+    if search.is_enabled():
+        assert search.get_ranked_post_ids("комета") == [post.pk], (
+            "Убедитесь, что после загрузки пересобирается поисковый индекс."
+        )
+    # Последовательность pk сдвинута за загруженные строки.
+    assert mixer.blend("blog.Post", author=user).pk > 100
+
+
+def test_existing_rows_are_looked_up_in_chunks(tmp_path):
+    rows = [
+        {
+            "model": "blog.category",
+            "pk": number,
+            "fields": {
+                "title": "Категория",
+                "description": f"Описание {number}",
+                "slug": f"category-{number}",
+            },
+        }
+        for number in range(1, 1001)
+    ]
+    fixture = tmp_path / "categories.json"
+    fixture.write_text(json.dumps(rows), encoding="utf-8")
+    call_command("bulk_loaddata", str(fixture), stdout=io.StringIO())
+
+    with CaptureQueriesContext(connection) as context:
+        call_command("bulk_loaddata", str(fixture), stdout=io.StringIO())
+    lookups = [
+        query["sql"] for query in context.captured_queries
+        if query["sql"].startswith('SELECT "blog_category"."id"')
+    ]
+    assert len(lookups) == 2, (
+        "Убедитесь, что поиск существующих строк разбит на запросы "
+        "не длиннее 900 параметров."
+    )
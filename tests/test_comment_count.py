@@ -0,0 +1,131 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Model
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+from rest_framework.test import APIClient
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count(post: Model) -> int:
+    post.refresh_from_db(fields=["comment_count"])
+    return post.comment_count
+
+
+def test_comment_count_follows_views(
+    user_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Первый"})
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Второй"})
+    assert _count(post) == 2, (
+        "Убедитесь, что добавление комментария увеличивает"
+        " `Post.comment_count`."
+    )
+
+    comment = post.comments.first()
+    user_client.post(
+        f"/posts/{post.id}/delete_comment/{comment.id}/"
+    )
+    assert _count(post) == 1, (
+        "Убедитесь, что удаление комментария уменьшает"
+        " `Post.comment_count`."
+    )
+
+
+def test_comment_count_follows_api(user, post_with_published_location):
+    post = post_with_published_location
+    client = APIClient()
+    client.force_authenticate(user)
+    response = client.post(
+        f"/api/v1/posts/{post.id}/comments/", {"text": "Из API"}
+    )
+    assert response.status_code == 201
+    assert _count(post) == 1
+
+    client.delete(
+        f"/api/v1/posts/{post.id}/comments/{response.data['id']}/"
+    )
+    assert _count(post) == 0
+
+
+def test_comment_count_on_move_and_cascade(
+    mixer: Mixer, post_with_published_location, post_of_another_author
+):
+    post, other_post = post_with_published_location, post_of_another_author
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    assert _count(post) == 3
+
+    moved = type(comments[0]).objects.get(pk=comments[0].pk)
+    moved.post = other_post
+    moved.save()
+    assert (_count(post), _count(other_post)) == (2, 1), (
+        "Убедитесь, что при переносе комментария к другому посту"
+        " счётчики обоих постов обновляются."
+    )
+
+    comments[1].author.delete()
+    assert _count(post) == 1, (
+        "Убедитесь, что каскадное удаление комментариев уменьшает"
+        " `Post.comment_count`."
+    )
+
+
+def test_recount_comments_command(mixer: Mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command("recount_comments", stdout=StringIO())
+    assert _count(post) == 2
+
+
+def _comment_fts_ids():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT rowid FROM blog_comment_fts")
+        return {row[0] for row in cursor.fetchall()}
+
+
+def test_cascade_deletes_comments_in_bulk(
+    mixer: Mixer, post_with_published_location, post_of_another_author
+):
+    post, other_post = post_with_published_location, post_of_another_author
+    author = mixer.blend("auth.User")
+    mixer.cycle(5).blend("blog.Comment", post=post, author=author)
+    mixer.cycle(5).blend("blog.Comment", post=other_post, author=author)
+    kept = mixer.blend("blog.Comment", post=post)
+
+    with CaptureQueriesContext(connection) as ctx:
+        author.delete()
+    deletes = [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith('DELETE FROM "blog_comment"')
+    ]
+    assert len(deletes) == 1, (
+        "Убедитесь, что при удалении пользователя его комментарии"
+        " удаляются одним запросом, а не по одному."
+    )
+    assert (_count(post), _count(other_post)) == (1, 0)
+    assert _comment_fts_ids() == {kept.pk}
+
+    post.delete()
+    assert _comment_fts_ids() == set(), (
+        "Убедитесь, что при удалении поста его комментарии"
+        " убираются из поискового индекса."
+    )
+
+
+def test_queryset_delete_updates_counters(
+    mixer: Mixer, post_with_published_location, post_of_another_author
+):
+    post, other_post = post_with_published_location, post_of_another_author
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    mixer.blend("blog.Comment", post=other_post)
+
+    type(comments[0]).objects.filter(post=post).delete()
+    assert (_count(post), _count(other_post)) == (0, 1)
+    assert len(_comment_fts_ids()) == 1
@@ -0,0 +1,183 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.utils.http import http_date
+from mixer.backend.django import Mixer
+from rest_framework.test import APIClient
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _assert_not_modified(client, url, response):
+    assert response.has_header("ETag"), (
+        f"Убедитесь, что ответ на `{url}` содержит заголовок ETag."
+    )
+    repeated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert repeated.status_code == 304, (
+        f"Убедитесь, что `{url}` отвечает 304 на совпадающий If-None-Match."
+    )
+    assert not repeated.content
+
+
+def _page_urls(post):
+    return (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    )
+
+
+def test_pages_answer_not_modified(
+    unlogged_client, post_with_published_location
+):
+    for url in _page_urls(post_with_published_location):
+        response = unlogged_client.get(url)
+        _assert_not_modified(unlogged_client, url, response)
+        assert not response.has_header("Last-Modified"), (
+            f"Убедитесь, что `{url}` не отдаёт Last-Modified: он не"
+            " сдвигается при удалении постов и правке категорий."
+        )
+
+
+def test_no_validators_for_logged_in_users(
+    user_client, post_with_published_location
+):
+    for url in _page_urls(post_with_published_location):
+        assert not user_client.get(url).has_header("ETag"), (
+            "Убедитесь, что вошедший пользователь не получает ETag:"
+            " 304 потерял бы сообщения и новый CSRF-токен."
+        )
+
+
+def test_no_validators_with_pending_messages(
+    unlogged_client, post_with_published_location
+):
+    unlogged_client.cookies["messages"] = "pending"
+    assert not unlogged_client.get("/").has_header("ETag")
+
+
+@pytest.mark.parametrize("change", ("delete", "unpublish_category"))
+def test_feed_changes_after_delete_or_unpublish(
+    mixer: Mixer, unlogged_client, post_with_published_location, change
+):
+    post = post_with_published_location
+    mixer.blend(
+        "blog.Post", category=post.category, author=post.author,
+        pub_date=post.pub_date - timedelta(days=1), is_published=True,
+    )
+    urls = _page_urls(post)[:3]
+    etags = {url: unlogged_client.get(url)["ETag"] for url in urls}
+    if change == "delete":
+        post.delete()
+    else:
+        post.category.is_published = False
+        post.category.save()
+
+    for url in urls:
+        by_date = unlogged_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        assert by_date.status_code != 304, (
+            f"Убедитесь, что после изменения (`{change}`) `{url}` не"
+            " отвечает 304 на If-Modified-Since."
+        )
+        by_etag = unlogged_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert by_etag.status_code != 304, (
+            f"Убедитесь, что после изменения (`{change}`) ETag"
+            f" страницы `{url}` меняется."
+        )
+
+
+def test_profile_etag_changes_with_user_fields(
+    unlogged_client, post_with_published_location
+):
+    author = post_with_published_location.author
+    url = f"/profile/{author.username}/"
+    etag = unlogged_client.get(url)["ETag"]
+    author.first_name = "Новое"
+    author.last_name = "Имя"
+    author.save()
+    response = unlogged_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что правка имени пользователя меняет ETag его профиля."
+    )
+
+
+def test_etag_changes_with_comments(
+    mixer: Mixer, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    for url in ("/", f"/posts/{post.id}/"):
+        etag = unlogged_client.get(url)["ETag"]
+        comment = mixer.blend("blog.Comment", post=post)
+        response = unlogged_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f"Убедитесь, что новый комментарий меняет ETag страницы `{url}`."
+        )
+        etag = response["ETag"]
+        comment.text = "Исправленный текст"
+        comment.save()
+        response = unlogged_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            "Убедитесь, что правка комментария меняет ETag"
+            f" страницы `{url}`."
+        )
+
+
+def test_api_answers_not_modified(mixer: Mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    client = APIClient()
+    for url in (
+        "/api/v1/posts/",
+        f"/api/v1/posts/{post.id}/",
+        f"/api/v1/posts/{post.id}/comments/",
+    ):
+        response = client.get(url)
+        _assert_not_modified(client, url, response)
+        assert not response.has_header("Last-Modified"), (
+            f"Убедитесь, что `{url}` не отдаёт Last-Modified: он не"
+            " сдвигается при удалении строк и смене имени автора."
+        )
+
+    url = f"/api/v1/posts/{post.id}/comments/"
+    etag = client.get(url)["ETag"]
+    mixer.blend("blog.Comment", post=post)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_api_etag_changes_with_author_name(post_with_published_location):
+    post = post_with_published_location
+    client = APIClient()
+    urls = ("/api/v1/posts/", f"/api/v1/posts/{post.id}/")
+    etags = {url: client.get(url)["ETag"] for url in urls}
+    post.author.username = "renamed_author"
+    post.author.save()
+    for url in urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f"Убедитесь, что смена имени автора меняет ETag `{url}`."
+        )
+
+
+def test_api_list_changes_after_delete(
+    mixer: Mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend(
+        "blog.Post", category=post.category, author=post.author,
+        pub_date=post.pub_date - timedelta(days=1), is_published=True,
+    )
+    client = APIClient()
+    etag = client.get("/api/v1/posts/")["ETag"]
+    post.delete()
+    response = client.get(
+        "/api/v1/posts/",
+        HTTP_IF_NONE_MATCH=etag,
+        HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60),
+    )
+    assert response.status_code == 200, (
+        "Убедитесь, что после удаления поста список в API не отвечает 304."
+    )
@@ -0,0 +1,99 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+from mixer.backend.django import Mixer
+
+from blog.export import export, iter_rows
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user):
+    return mixer.cycle(7).blend("blog.Post", author=user)
+
+
+@pytest.fixture
+def staff_client(user):
+    user.is_staff = True
+    user.save()
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def test_keyset_batches_cover_all_rows(posts, django_assert_num_queries):
+    # 7 строк пачками по 3: три запроса, последний неполный.
+    with django_assert_num_queries(3):
+        rows = list(iter_rows(Post, ("id", "title"), batch_size=3))
+    assert [row[0] for row in rows] == sorted(post.id for post in posts), (
+        "Убедитесь, что выгрузка проходит все строки по порядку pk."
+    )
+
+
+def test_ndjson_export(posts):
+    lines = b"".join(export("posts", batch_size=3)).decode().splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert len(rows) == len(posts)
+    assert rows[0]["author__username"] == posts[0].author.username
+
+
+def test_csv_gzip_export(posts):
+    data = gzip.decompress(b"".join(
+        export("comments", "csv", compress=True)
+    )).decode()
+    assert list(csv.reader(io.StringIO(data))) == [[
+        "id", "post_id", "author_id", "author__username", "text",
+        "created_at", "is_published",
+    ]], "Убедитесь, что у пустой CSV-выгрузки есть заголовок."
+
+
+def test_command_writes_file(posts, tmp_path):
+    output = tmp_path / "posts.ndjson.gz"
+    call_command(
+        "export_data", "posts", "--gzip", "--output", str(output),
+        stderr=io.StringIO(),
+    )
+    with gzip.open(output, "rt", encoding="utf-8") as stream:
+        assert len(stream.readlines()) == len(posts)
+
+
+def test_command_writes_to_given_stdout(posts):
+    stdout = io.StringIO()
+    call_command("export_data", "posts", stdout=stdout)
+    assert len(stdout.getvalue().splitlines()) == len(posts), (
+        "Убедитесь, что выгрузка без --output пишется в self.stdout."
+    )
+
+    binary = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    call_command("export_data", "posts", "--gzip", stdout=binary)
+    data = gzip.decompress(binary.buffer.getvalue()).decode()
+    assert len(data.splitlines()) == len(posts)
+
+
+def test_endpoint_streams_for_staff(posts, staff_client):
+    url = reverse("blog:export", kwargs={"kind": "posts"})
+    response = staff_client.get(url, {"format": "csv"})
+    assert response.status_code == 200
+    assert response.streaming, (
+        "Убедитесь, что выгрузка отдаётся через StreamingHttpResponse."
+    )
+    assert response["Content-Type"].startswith("text/csv")
+    assert 'filename="posts.csv"' in response["Content-Disposition"]
+    body = b"".join(response.streaming_content).decode()
+    assert len(list(csv.reader(io.StringIO(body)))) == len(posts) + 1
+
+
+def test_endpoint_is_staff_only(user_client):
+    url = reverse("blog:export", kwargs={"kind": "posts"})
+    response = user_client.get(url)
+    assert response.status_code == 302, (
+        "Убедитесь, что выгрузка недоступна обычным пользователям."
+    )
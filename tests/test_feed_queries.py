@@ -0,0 +1,62 @@
+import pytest
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия, пользователь, объект страницы (категория/профиль),
+# COUNT для пагинатора и сам список постов.
+FEED_MAX_QUERIES = 6
+
+
+@pytest.fixture
+def posts_of_different_authors(mixer: Mixer, published_category):
+    """Посты с разными авторами и местоположениями: N+1 проявится сразу."""
+    return mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post",
+        category=published_category,
+        location__is_published=True,
+    )
+
+
+@pytest.mark.parametrize("client_fixture", ("user_client", "unlogged_client"))
+def test_feed_query_count(
+    request,
+    client_fixture: str,
+    posts_of_different_authors,
+    published_category,
+    user,
+    django_assert_max_num_queries,
+):
+    client: Client = request.getfixturevalue(client_fixture)
+    author = posts_of_different_authors[0].author
+    for url in (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{author.username}/",
+        f"/profile/{user.username}/",
+    ):
+        with django_assert_max_num_queries(FEED_MAX_QUERIES):
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f"Убедитесь, что страница `{url}` загружается без ошибок."
+        )
+
+
+def test_feed_loads_only_card_columns():
+    from blog.models import Post
+
+    sql = str(Post.objects.for_feed().query)
+    for column in (
+        '"blog_post"."text"',
+        '"blog_post"."text_html"',
+        '"blog_post"."created_at"',
+        '"auth_user"."password"',
+        '"blog_category"."description"',
+    ):
+        assert column not in sql, (
+            f"Убедитесь, что лента не загружает колонку {column}."
+        )
+    assert '"blog_post"."excerpt"' in sql
@@ -0,0 +1,50 @@
+import pytest
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_templates_use_cached_loader():
+    loaders = engines.all()[0].engine.template_loaders
+    assert isinstance(loaders[0], CachedLoader), (
+        "Убедитесь, что шаблоны загружаются через cached.Loader."
+    )
+
+
+def test_post_card_is_cached_until_post_changes(
+    user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in user_client.get("/").content.decode()
+
+    # update() не сдвигает updated_at — карточка берётся из кеша.
+    Post.objects.filter(pk=post.pk).update(title="Тихо изменённый")
+    assert "Тихо изменённый" not in user_client.get("/").content.decode(), (
+        "Убедитесь, что карточка поста кешируется."
+    )
+
+    post.refresh_from_db()
+    post.save()
+    assert "Тихо изменённый" in user_client.get("/").content.decode(), (
+        "Убедитесь, что кеш карточки сбрасывается при изменении поста."
+    )
+
+
+def test_post_card_tracks_related_objects(
+    user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    post.location.name = "Новое место"
+    post.location.save()
+    post.author.username = "renamed_author"
+    post.author.save()
+
+    content = user_client.get("/").content.decode()
+    assert "Новое место" in content and "@renamed_author" in content, (
+        "Убедитесь, что карточка обновляется при смене местоположения"
+        " или имени автора."
+    )
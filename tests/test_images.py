@@ -0,0 +1,119 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+from PIL import Image
+from rest_framework.test import APIClient
+
+from blog.images import process_batch
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.BLOG_IMAGE_WIDTHS = (320, 640)
+
+
+def make_image_file(
+    size=(1000, 500), name="photo.png", color=(73, 109, 137, 128)
+):
+    buffer = BytesIO()
+    Image.new("RGBA", size, color=color).save(buffer, "PNG")
+    return ImageFile(buffer, name=name)
+
+
+@pytest.fixture
+def post_with_image(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        is_published=True,
+        author=user,
+        category=published_category,
+        location=None,
+        image=make_image_file(),
+    )
+
+
+def test_variants_are_made_by_worker(post_with_image, user_client):
+    post = post_with_image
+    assert post.image_variants == {}, (
+        "Убедитесь, что уменьшенные копии не создаются при сохранении"
+        " поста — это работа воркера."
+    )
+    content = user_client.get("/").content.decode()
+    assert post.image.url in content and "srcset" not in content
+
+    call_command("generate_image_variants", stdout=StringIO())
+
+    post.refresh_from_db()
+    variants = post.image_variants
+    assert (variants["width"], variants["height"]) == (1000, 500)
+    for image_format, extension in (("webp", "WEBP"), ("jpeg", "JPEG")):
+        assert set(variants[image_format]) == {"320", "640"}
+        name = variants[image_format]["320"]
+        with default_storage.open(name) as variant:
+            image = Image.open(variant)
+            assert (image.format, image.size) == (extension, (320, 160))
+
+    content = user_client.get("/").content.decode()
+    assert post.image_srcset_webp in content, (
+        "Убедитесь, что карточка поста отдаёт WebP-копии через srcset."
+    )
+    assert f'srcset="{post.image_srcset_jpeg}"' in content
+    assert process_batch() == (0, 0)
+
+
+def test_small_image_is_not_upscaled(mixer: Mixer, user):
+    post = mixer.blend(
+        "blog.Post", author=user, image=make_image_file((200, 100))
+    )
+    process_batch()
+    post.refresh_from_db()
+    assert set(post.image_variants["jpeg"]) == {"200"}
+
+
+def test_new_image_replaces_variants(post_with_image):
+    post = post_with_image
+    process_batch()
+    post.refresh_from_db()
+    old_names = list(post.image_variants["webp"].values())
+
+    post.image = make_image_file(name="other.png", color=(0, 0, 0, 255))
+    post.save()
+
+    post.refresh_from_db()
+    assert post.image_variants == {}
+    assert post.image_src == post.image.url
+    call_command("sweep_images", grace=0, stdout=StringIO())
+    assert not any(default_storage.exists(name) for name in old_names), (
+        "Убедитесь, что копии старого изображения удаляются."
+    )
+
+
+def test_broken_image_is_not_retried(post_with_image):
+    post = post_with_image
+    with default_storage.open(post.image.name, "wb") as image:
+        image.write(b"not an image")
+
+    assert process_batch() == (0, 1)
+    post.refresh_from_db()
+    assert "error" in post.image_variants
+    assert post.image_src == post.image.url
+    assert process_batch() == (0, 0)
+
+
+def test_api_returns_srcset(post_with_image):
+    response = APIClient().get(f"/api/v1/posts/{post_with_image.id}/")
+    assert response.data["srcset"] is None
+
+    process_batch()
+    response = APIClient().get(f"/api/v1/posts/{post_with_image.id}/")
+    srcset = response.data["srcset"]
+    assert set(srcset) == {"webp", "jpeg"}
+    assert srcset["webp"].startswith("http://testserver/media/")
+    assert srcset["webp"].endswith(" 640w")
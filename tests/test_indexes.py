@@ -0,0 +1,71 @@
+from typing import List
+
+import pytest
+from django.db import connection
+from django.db.models import QuerySet
+
+from blog.models import Post
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="EXPLAIN QUERY PLAN — синтаксис SQLite",
+    ),
+]
+
+
+def get_query_plan(queryset: QuerySet) -> List[str]:
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_uses_index(queryset: QuerySet, table: str, index: str):
+    plan = get_query_plan(queryset)
+    table_steps = [step for step in plan if f" {table} " in f"{step} "]
+    assert table_steps, f"В плане запроса нет таблицы {table}: {plan}"
+    for step in table_steps:
+        assert f"USING INDEX {index}" in step, (
+            f"Убедитесь, что запрос к `{table}` использует индекс"
+            f" `{index}`, а не просматривает всю таблицу. План: {plan}"
+        )
+
+
+def test_feed_uses_index():
+    assert_uses_index(
+        Post.objects.published().for_feed()[:10],
+        "blog_post",
+        "post_published_feed_idx",
+    )
+
+
+def test_category_feed_uses_index(published_category):
+    assert_uses_index(
+        Post.objects.filter(
+            category=published_category, is_published=True
+        ).published().for_feed()[:10],
+        "blog_post",
+        "post_category_feed_idx",
+    )
+
+
+@pytest.mark.parametrize("only_published", (False, True))
+def test_profile_feed_uses_index(user, only_published):
+    posts = Post.objects.filter(author=user)
+    if only_published:
+        posts = posts.published()
+    assert_uses_index(
+        posts.for_feed()[:10], "blog_post", "post_author_feed_idx"
+    )
+
+
+@pytest.mark.parametrize("only_published", (False, True))
+def test_comments_use_index(post_with_published_location, only_published):
+    comments = post_with_published_location.comments.select_related(
+        "author"
+    )
+    if only_published:
+        comments = comments.filter(is_published=True)
+    assert_uses_index(comments, "blog_comment", "comment_post_created_idx")
@@ -0,0 +1,81 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts_with_same_pub_date(mixer: Mixer, user, published_category):
+    """Часть постов с одинаковой датой: порядок держится на id."""
+    now = timezone.now() - timedelta(days=1)
+    pub_dates = (
+        now - timedelta(minutes=i // 3) for i in range(N_PER_PAGE * 3)
+    )
+    return mixer.cycle(N_PER_PAGE * 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=pub_dates,
+    )
+
+
+def _get_page(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.context["page_obj"]
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_walks_whole_feed(client, posts_with_same_pub_date):
+    expected = sorted(
+        posts_with_same_pub_date,
+        key=lambda post: (post.pub_date, post.id),
+        reverse=True,
+    )
+
+    page = _get_page(client, "/")
+    assert not page.has_previous()
+    pages = [page]
+    while page.has_next():
+        page = _get_page(client, f"/?cursor={page.next_cursor}")
+        pages.append(page)
+    seen = [post.id for page in pages for post in page]
+    assert seen == [post.id for post in expected], (
+        "Убедитесь, что курсорная пагинация выдаёт все посты ленты"
+        " по одному разу в порядке «от новых к старым»."
+    )
+
+    back = _get_page(client, f"/?cursor={pages[-1].previous_cursor}")
+    assert [post.id for post in back] == [post.id for post in pages[-2]]
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_page_cost_does_not_grow(client, posts_with_same_pub_date):
+    with CaptureQueriesContext(connection) as first:
+        page = _get_page(client, "/")
+    page = _get_page(client, f"/?cursor={page.next_cursor}")
+    with CaptureQueriesContext(connection) as deep:
+        _get_page(client, f"/?cursor={page.next_cursor}")
+
+    assert len(first) == len(deep)
+    for query in deep.captured_queries:
+        assert not re.search(r"COUNT\(\*\)|\bOFFSET\b", query["sql"]), (
+            "Убедитесь, что курсорная пагинация не использует"
+            " COUNT(*) и OFFSET."
+        )
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_bad_cursor_gives_first_page(client, posts_with_same_pub_date):
+    first = _get_page(client, "/")
+    broken = _get_page(client, "/?cursor=not-a-cursor")
+    assert [post.id for post in broken] == [post.id for post in first]
@@ -0,0 +1,88 @@
+import logging
+import re
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from monitoring.metrics import registry
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def parse_server_timing(header):
+    return {
+        name: float(duration)
+        for name, duration in re.findall(r"(\w+);dur=([\d.]+)", header)
+    }
+
+
+def test_server_timing_header(post_with_published_location):
+    client = Client()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/posts/{post_with_published_location.id}/")
+
+    assert response.status_code == 200
+    header = response["Server-Timing"]
+    assert set(parse_server_timing(header)) == {"db", "tpl", "total"}, (
+        "Убедитесь, что ответ содержит заголовок `Server-Timing`"
+        " с временем БД, шаблонов и общим временем."
+    )
+    assert f'desc="{len(queries)} queries"' in header
+    timings = parse_server_timing(header)
+    assert timings["tpl"] > 0
+    assert timings["total"] >= timings["tpl"]
+
+
+def test_metrics_are_aggregated_per_view(
+    client, admin_client, post_with_published_location
+):
+    for _ in range(3):
+        client.get("/")
+
+    snapshot = registry.snapshot()
+    index = snapshot["blog:index"]
+    assert index["duration_ms"]["count"] == 3
+    assert sum(b["count"] for b in index["queries"]["buckets"]) == 3
+    assert index["response_bytes"]["sum"] > 0
+
+    response = admin_client.get("/monitoring/metrics/")
+    assert response.status_code == 200
+    assert response.json()["blog:index"]["duration_ms"]["count"] == 3
+
+
+def test_metrics_endpoint_is_staff_only(user_client):
+    response = user_client.get("/monitoring/metrics/")
+    assert response.status_code == 302, (
+        "Убедитесь, что метрики доступны только сотрудникам (is_staff)."
+    )
+
+
+def test_request_is_logged(caplog, client):
+    logger = logging.getLogger("monitoring.requests")
+    logger.addHandler(caplog.handler)
+    try:
+        client.get("/")
+    finally:
+        logger.removeHandler(caplog.handler)
+    record = next(
+        r for r in caplog.records if r.name == "monitoring.requests"
+    )
+    assert record.view == "blog:index"
+    assert record.status == 200
+    assert record.queries >= 1
+
+
+def test_disabled_middleware_is_not_used(settings, client):
+    settings.MONITORING_ENABLED = False
+    response = client.get("/")
+    assert "Server-Timing" not in response
+    assert registry.snapshot() == {}
@@ -0,0 +1,89 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import OutgoingEmail
+from blog.outbox import claim_emails, get_due_ids, send_batch
+
+pytestmark = [pytest.mark.django_db]
+
+
+def failing_send_messages(self, messages):
+    raise ConnectionError("SMTP недоступен")
+
+
+def test_post_create_only_enqueues_email(
+    user_client, user, published_category
+):
+    response = user_client.post(
+        "/posts/create/",
+        data={
+            "title": "Заголовок",
+            "text": "Текст",
+            "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+            "category": published_category.id,
+            "is_published": True,
+        },
+    )
+    assert response.status_code == 302
+    assert not mail.outbox, (
+        "Убедитесь, что создание поста не отправляет письмо синхронно."
+    )
+    assert OutgoingEmail.objects.filter(
+        recipients=user.email, status=OutgoingEmail.PENDING
+    ).exists()
+
+
+def test_send_outbox_command_sends_pending():
+    for i in range(3):
+        OutgoingEmail.enqueue(f"Тема {i}", "Текст", [f"u{i}@example.com"])
+
+    call_command("send_outbox", stdout=StringIO())
+
+    assert len(mail.outbox) == 3
+    assert not OutgoingEmail.objects.exclude(
+        status=OutgoingEmail.SENT
+    ).exists()
+
+
+def test_workers_do_not_share_a_batch():
+    for i in range(3):
+        OutgoingEmail.enqueue(f"Тема {i}", "Текст", [f"u{i}@example.com"])
+    # Оба воркера успели выбрать одни и те же строки.
+    first_ids = get_due_ids(10)
+    second_ids = get_due_ids(10)
+
+    assert len(claim_emails(first_ids)) == 3
+    assert claim_emails(second_ids) == [], (
+        "Убедитесь, что уже захваченные письма не достаются второму воркеру."
+    )
+    assert send_batch() == (0, 0)
+    assert not mail.outbox
+
+
+def test_failed_send_is_retried_with_backoff(monkeypatch):
+    email = OutgoingEmail.enqueue("Тема", "Текст", ["user@example.com"])
+    monkeypatch.setattr(
+        locmem.EmailBackend, "send_messages", failing_send_messages
+    )
+
+    with override_settings(BLOG_OUTBOX_MAX_ATTEMPTS=2):
+        assert send_batch() == (0, 1)
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.next_attempt_at > timezone.now()
+        assert "SMTP" in email.last_error
+
+        assert send_batch() == (0, 0), (
+            "Убедитесь, что повторная попытка откладывается."
+        )
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        send_batch()
+    email.refresh_from_db()
+    assert email.status == OutgoingEmail.FAILED
+    assert email.attempts == 2
@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import cache as page_cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _get_counting_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, len(queries)
+
+
+def test_anonymous_pages_are_cached(
+    unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    for url in (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/posts/{post.id}/",
+    ):
+        first, _ = _get_counting_queries(unlogged_client, url)
+        second, n_queries = _get_counting_queries(unlogged_client, url)
+        # Остаётся только запрос для ETag ленты.
+        assert n_queries <= 1, (
+            f"Убедитесь, что повторный анонимный запрос `{url}`"
+            " отдаётся из кеша без выборки постов."
+        )
+        assert first.content == second.content
+
+
+def test_logged_in_pages_are_not_cached(
+    user_client, post_with_published_location
+):
+    _get_counting_queries(user_client, "/")
+    _, n_queries = _get_counting_queries(user_client, "/")
+    assert n_queries > 0
+
+
+def test_comment_invalidates_feed_and_detail(
+    mixer: Mixer, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    detail_url = f"/posts/{post.id}/"
+    unlogged_client.get("/")
+    unlogged_client.get(detail_url)
+
+    comment = mixer.blend("blog.Comment", post=post, text="Новый отзыв")
+
+    assert "(1)" in unlogged_client.get("/").content.decode(), (
+        "Убедитесь, что новый комментарий сбрасывает кеш ленты."
+    )
+    assert comment.text in unlogged_client.get(detail_url).content.decode(), (
+        "Убедитесь, что новый комментарий сбрасывает кеш страницы поста."
+    )
+
+
+def test_comment_keeps_other_feed_pages(
+    mixer: Mixer, unlogged_client, post_with_published_location,
+    another_category
+):
+    post = post_with_published_location
+    mixer.blend(
+        "blog.Post", is_published=True, category=another_category,
+        location=post.location,
+    )
+    other_url = f"/category/{another_category.slug}/"
+    unlogged_client.get(other_url)
+
+    mixer.blend("blog.Comment", post=post)
+
+    _, n_queries = _get_counting_queries(unlogged_client, other_url)
+    assert n_queries <= 1, (
+        "Убедитесь, что комментарий сбрасывает кеш только тех страниц"
+        " лент, где видна карточка его поста."
+    )
+
+
+def test_username_change_invalidates_feed(
+    unlogged_client, post_with_published_location
+):
+    author = post_with_published_location.author
+    unlogged_client.get("/")
+    author.username = "renamed_author"
+    author.save()
+    assert author.username in unlogged_client.get("/").content.decode(), (
+        "Убедитесь, что смена имени пользователя сбрасывает кеш лент."
+    )
+
+
+def test_category_change_invalidates_feed(
+    unlogged_client, post_with_published_location
+):
+    category = post_with_published_location.category
+    unlogged_client.get("/")
+    category.title = "Переименованная категория"
+    category.save()
+    assert category.title in unlogged_client.get("/").content.decode()
+
+
+def test_cache_expires_at_next_publication(
+    monkeypatch, mixer: Mixer, unlogged_client, post_with_published_location
+):
+    mixer.blend(
+        "blog.Post",
+        pub_date=timezone.now() + timedelta(seconds=30),
+        is_published=True,
+    )
+    timeouts = []
+    monkeypatch.setattr(
+        page_cache.cache,
+        "set",
+        lambda key, value, timeout=None, **kwargs: (
+            key.startswith("blog:pagecache:page:")
+            and timeouts.append(timeout)
+        ),
+    )
+
+    unlogged_client.get("/")
+
+    assert timeouts and timeouts[0] <= 31, (
+        "Убедитесь, что кеш ленты истекает не позже момента"
+        " ближайшей отложенной публикации."
+    )
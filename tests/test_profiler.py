@@ -0,0 +1,48 @@
+import re
+
+import pytest
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+COLLAPSED_LINE_RE = re.compile(r"^\S.*;.* \d+$")
+
+
+@pytest.fixture
+def profiler_settings(settings, tmp_path):
+    settings.MONITORING_PROFILE_VIEWS = ["blog:index"]
+    settings.MONITORING_PROFILE_RATE = 1
+    settings.MONITORING_PROFILE_INTERVAL = 0.0005
+    settings.MONITORING_PROFILE_DIR = tmp_path
+    return settings
+
+
+def test_target_view_writes_collapsed_stacks(
+    profiler_settings, tmp_path, many_posts_with_published_locations
+):
+    client = Client()
+    for _ in range(3):
+        client.get("/")
+
+    files = list(tmp_path.glob("blog.index-*.collapsed"))
+    assert len(files) == 1, (
+        "Убедитесь, что профайлер пишет стеки выбранного view в файл."
+    )
+    lines = files[0].read_text().splitlines()
+    assert lines
+    assert all(COLLAPSED_LINE_RE.match(line) for line in lines)
+    assert any("blog/views.py" in line for line in lines), (
+        "Убедитесь, что в стеках видны функции проекта."
+    )
+
+
+def test_other_views_are_not_profiled(profiler_settings, tmp_path):
+    Client().get("/pages/about/")
+    assert not list(tmp_path.iterdir())
+
+
+def test_profiler_is_off_by_default(settings, tmp_path):
+    settings.MONITORING_PROFILE_DIR = tmp_path
+    settings.MONITORING_PROFILE_RATE = 1
+    Client().get("/")
+    assert not list(tmp_path.iterdir())
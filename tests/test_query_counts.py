@@ -0,0 +1,73 @@
+"""
+Число SQL-запросов на страницах не должно расти вместе с данными.
+
+Бюджеты лежат в query_counts.json; данные подобраны так, чтобы N+1
+сразу проявился: у каждого поста свой автор и местоположение,
+у комментариев — разные авторы.
+"""
+import pytest
+from django.test.client import Client
+from django.urls import reverse
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+URL_NAMES = (
+    "blog:index",
+    "blog:post_detail",
+    "blog:profile",
+    "blog:category_posts",
+    "pages:staticpage_list",
+    "posts-list",
+    "posts-detail",
+    "comments-list",
+    "comments-detail",
+)
+
+
+@pytest.fixture
+def n_plus_one_data(mixer: Mixer, published_category):
+    posts = mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post",
+        category=published_category,
+        location__is_published=True,
+    )
+    post = posts[0]
+    comments = mixer.cycle(N_PER_PAGE).blend("blog.Comment", post=post)
+    mixer.cycle(N_PER_PAGE).blend("pages.StaticPage", is_published=True)
+    return post, comments[0]
+
+
+def get_url(url_name, post, comment):
+    kwargs = {
+        "blog:index": {},
+        "blog:post_detail": {"id": post.id},
+        "blog:profile": {"username": post.author.username},
+        "blog:category_posts": {"category_slug": post.category.slug},
+        "pages:staticpage_list": {},
+        "posts-list": {},
+        "posts-detail": {"pk": post.id},
+        "comments-list": {"post_id": post.id},
+        "comments-detail": {"post_id": post.id, "pk": comment.id},
+    }[url_name]
+    return reverse(url_name, kwargs=kwargs)
+
+
+@pytest.mark.parametrize("client_kind", ("anonymous", "user"))
+@pytest.mark.parametrize("url_name", URL_NAMES)
+def test_query_count_within_budget(
+    user, n_plus_one_data, assert_query_budget, url_name, client_kind
+):
+    client = Client()
+    if client_kind == "user":
+        client.force_login(user)
+    url = get_url(url_name, *n_plus_one_data)
+
+    with assert_query_budget(f"{url_name} / {client_kind}"):
+        response = client.get(url)
+
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
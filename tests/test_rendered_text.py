@@ -0,0 +1,61 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = "Первая <строка>\nвторая строка " + " ".join(
+    f"слово{number}" for number in range(30)
+)
+
+
+def test_post_derived_fields_follow_text(mixer: Mixer):
+    post = mixer.blend("blog.Post", text=LONG_TEXT)
+    post.refresh_from_db()
+    assert post.text_html.startswith(
+        "Первая &lt;строка&gt;<br>вторая строка"
+    ), "Убедитесь, что Post.text_html — экранированный текст с <br>."
+    assert post.excerpt == (
+        "Первая <строка> вторая строка слово0 слово1 слово2 слово3 "
+        "слово4 слово5 …"
+    ), "Убедитесь, что Post.excerpt — первые 10 слов текста."
+
+    post.text = "Новый текст"
+    post.save()
+    post.refresh_from_db()
+    assert (post.excerpt, post.text_html) == ("Новый текст", "Новый текст")
+
+
+@pytest.mark.parametrize("model", ["blog.Post", "blog.Comment"])
+def test_update_fields_saves_derived_fields(mixer: Mixer, model):
+    obj = mixer.blend(model, text="Старый текст")
+    obj.text = "Новый\nтекст"
+    obj.save(update_fields=["text"])
+    obj.refresh_from_db()
+    assert obj.text_html == "Новый<br>текст", (
+        "Убедитесь, что save(update_fields=['text']) сохраняет и "
+        "производные поля."
+    )
+
+
+def test_comment_html_and_bulk_create(mixer: Mixer, user):
+    post = mixer.blend("blog.Post")
+    Comment.objects.bulk_create([
+        Comment(post=post, author=user, text="a\nb"),
+    ])
+    assert Comment.objects.get().text_html == "a<br>b", (
+        "Убедитесь, что HTML комментария считается и при bulk_create."
+    )
+
+
+def test_feed_does_not_load_text(mixer: Mixer, published_category):
+    mixer.blend("blog.Post", category=published_category, text=LONG_TEXT)
+    with CaptureQueriesContext(connection) as queries:
+        posts = list(Post.objects.for_feed())
+    assert posts
+    assert '"blog_post"."text"' not in queries[0]["sql"], (
+        "Убедитесь, что ленты не загружают полный текст постов."
+    )
@@ -0,0 +1,88 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import DEFAULT_DB_ALIAS, router
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from blog.cache import anonymous_page_cache
+from blog.models import Post
+from blogicum.replicas import STICKY_COOKIE, replica_reads, use_replicas
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica1"]
+    return settings.DATABASE_REPLICAS
+
+
+def read_db(request):
+    with use_replicas(request):
+        return router.db_for_read(Post)
+
+
+def test_safe_reads_go_to_replica(replicas):
+    request = RequestFactory().get("/")
+    assert read_db(request) == "replica1", (
+        "Убедитесь, что GET-запросы лент читают с реплики."
+    )
+    assert router.db_for_read(Post) == DEFAULT_DB_ALIAS, (
+        "Убедитесь, что вне use_replicas чтения идут в основную базу."
+    )
+
+
+def test_writes_and_sticky_reads_go_to_primary(replicas):
+    factory = RequestFactory()
+    assert read_db(factory.post("/")) == DEFAULT_DB_ALIAS
+    sticky = factory.get("/")
+    sticky.COOKIES[STICKY_COOKIE] = "1"
+    assert read_db(sticky) == DEFAULT_DB_ALIAS, (
+        "Убедитесь, что после записи пользователь читает из основной базы."
+    )
+    with use_replicas(factory.get("/")):
+        assert router.db_for_write(Post) == DEFAULT_DB_ALIAS
+
+
+def test_no_replicas_configured():
+    assert read_db(RequestFactory().get("/")) == DEFAULT_DB_ALIAS
+
+
+@pytest.mark.django_db
+def test_comment_sets_sticky_cookie(
+    replicas, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    response = user_client.post(
+        reverse("blog:add_comment", kwargs={"id": post.id}),
+        {"text": "Новый комментарий"},
+    )
+    assert response.status_code == 302
+    assert STICKY_COOKIE in response.cookies, (
+        "Убедитесь, что после комментария ставится cookie чтения"
+        " из основной базы."
+    )
+
+    response = user_client.get(
+        reverse("blog:post_detail", kwargs={"id": post.id})
+    )
+    assert response.status_code == 200
+    assert STICKY_COOKIE not in response.cookies
+
+
+@pytest.mark.django_db
+def test_page_cache_is_filled_from_primary(replicas):
+    read_from = []
+
+    @replica_reads
+    @anonymous_page_cache(lambda: [])
+    def view(request):
+        read_from.append(router.db_for_read(Post))
+        return HttpResponse("ok")
+
+    request = RequestFactory().get("/cached/")
+    request.user = AnonymousUser()
+    view(request)
+    assert read_from == [DEFAULT_DB_ALIAS], (
+        "Убедитесь, что страница для кеша строится по основной базе:"
+        " отставшая реплика попала бы в кеш на весь его TTL."
+    )
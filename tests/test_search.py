@@ -0,0 +1,109 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from mixer.backend.django import Mixer
+from rest_framework.test import APIClient
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _found_ids(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_search_by_title_text_and_comment(
+    mixer: Mixer, client, post_with_published_location
+):
+    post = post_with_published_location
+    post.title = "Марсианские хроники"
+    post.text = "Про красную планету"
+    post.save()
+    assert _found_ids(client, "марсианские") == [post.id]
+    assert _found_ids(client, "планет") == [post.id], (
+        "Убедитесь, что поиск находит слова по префиксу."
+    )
+
+    comment = mixer.blend("blog.Comment", post=post, text="Ракета улетела")
+    assert _found_ids(client, "ракета") == [post.id]
+
+    comment.delete()
+    assert _found_ids(client, "ракета") == []
+
+
+def test_search_ranks_title_higher(mixer: Mixer, client, published_category):
+    in_text = mixer.blend(
+        "blog.Post", category=published_category,
+        title="Обычный день", text="вечером видели комету",
+    )
+    in_title = mixer.blend(
+        "blog.Post", category=published_category,
+        title="Комета", text="ничего особенного",
+    )
+    assert _found_ids(client, "комет") == [in_title.id, in_text.id]
+
+
+def test_search_respects_visibility(
+    client, future_posts, posts_with_unpublished_category
+):
+    for post in future_posts + posts_with_unpublished_category:
+        assert post.id not in _found_ids(client, post.title)
+
+
+def test_search_ignores_fts_syntax(client, post_with_published_location):
+    _found_ids(client, 'NEAR("a" OR *) "')
+
+
+def test_api_search(post_with_published_location):
+    post = post_with_published_location
+    post.title = "Уникальнейший заголовок"
+    post.save()
+    response = APIClient().get("/api/v1/posts/", {"search": "уникальнейший"})
+    assert [item["id"] for item in response.data["results"]] == [post.id]
+
+
+def test_rebuild_search_index(client, post_with_published_location):
+    post = post_with_published_location
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM blog_post_fts")
+    assert _found_ids(client, post.title) == []
+
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert post.id in _found_ids(client, post.title)
+
+
+def test_api_search_is_ranked(mixer: Mixer, published_category):
+    in_text = mixer.blend(
+        "blog.Post", category=published_category,
+        title="Обычный день", text="вечером видели комету",
+    )
+    in_title = mixer.blend(
+        "blog.Post", category=published_category,
+        title="Комета", text="ничего особенного",
+    )
+    response = APIClient().get("/api/v1/posts/", {"search": "комет"})
+    assert [item["id"] for item in response.data["results"]] == [
+        in_title.id, in_text.id
+    ], "Убедитесь, что поиск в API отдаёт посты в порядке ранга."
+    assert response.data["count"] == 2
+
+
+def test_hidden_posts_do_not_take_search_limit(
+    mixer: Mixer, client, settings, published_category
+):
+    settings.BLOG_SEARCH_MAX_RESULTS = 1
+    mixer.blend(
+        "blog.Post", category=published_category, is_published=False,
+        title="Комета", text="ничего особенного",
+    )
+    visible = mixer.blend(
+        "blog.Post", category=published_category,
+        title="Обычный день", text="вечером видели комету",
+    )
+    assert _found_ids(client, "комет") == [visible.id], (
+        "Убедитесь, что неопубликованные посты отсекаются до ограничения "
+        "BLOG_SEARCH_MAX_RESULTS."
+    )
@@ -0,0 +1,152 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+
+from monitoring import slow_queries
+from monitoring.slow_queries import (
+    SlowQueryRecorder, SlowQueryStats, get_fingerprint, normalize_sql,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def slow_query_records():
+    records = []
+
+    class Handler(logging.Handler):
+        def emit(self, record):
+            records.append(json.loads(record.getMessage()))
+
+    # Вместо файла из settings.LOGGING — список в памяти.
+    logger = logging.getLogger("monitoring.slow_queries")
+    handlers = logger.handlers
+    logger.handlers = [Handler()]
+    yield records
+    logger.handlers = handlers
+
+
+def test_fingerprint_ignores_literals():
+    first = normalize_sql(
+        "SELECT *  FROM blog_post WHERE id IN (1, 2, 3) AND title = 'a'"
+    )
+    second = normalize_sql(
+        "SELECT * FROM blog_post WHERE id IN (7) AND title = 'b''c'"
+    )
+    assert first == second == (
+        "SELECT * FROM blog_post WHERE id IN (...) AND title = ?"
+    )
+    assert get_fingerprint(first) == get_fingerprint(second)
+
+
+def test_recorder_is_installed_on_connections():
+    connection.ensure_connection()
+    assert any(
+        isinstance(wrapper, SlowQueryRecorder)
+        for wrapper in connection.execute_wrappers
+    ), "Убедитесь, что журнал медленных запросов подключается к БД."
+
+
+def test_slow_query_is_recorded_with_origin(
+    slow_query_records, post_with_published_location
+):
+    stats = SlowQueryStats()
+    with connection.execute_wrapper(SlowQueryRecorder(0, stats)):
+        Client().get(f"/posts/{post_with_published_location.id}/")
+    assert not slow_query_records, (
+        "Убедитесь, что медленные запросы пишутся сводкой за окно,"
+        " а не по одному."
+    )
+    stats.flush()
+
+    assert slow_query_records
+    record = slow_query_records[0]
+    assert {
+        "fingerprint", "sql", "params", "count", "total_ms", "max_ms",
+    } <= set(record)
+    assert all(
+        r["origin"] and r["origin"].startswith("blog/")
+        for r in slow_query_records
+    ), (
+        "Убедитесь, что для запроса записывается строка кода проекта,"
+        " из которой он выполнен."
+    )
+
+
+def test_repeated_queries_are_aggregated(slow_query_records, settings):
+    settings.MONITORING_SLOW_QUERY_REPORT_SECONDS = 3600
+    stats = SlowQueryStats()
+    with connection.execute_wrapper(SlowQueryRecorder(0, stats)):
+        with connection.cursor() as cursor:
+            for number in range(5):
+                cursor.execute("SELECT %s", [number])
+    stats.flush()
+    assert len(slow_query_records) == 1
+    assert slow_query_records[0]["count"] == 5
+    assert slow_query_records[0]["sql"] == "SELECT %s"
+
+
+def test_stats_are_bounded(slow_query_records, monkeypatch, settings):
+    settings.MONITORING_SLOW_QUERY_REPORT_SECONDS = 3600
+    monkeypatch.setattr(slow_queries, "MAX_FINGERPRINTS", 3)
+    stats = SlowQueryStats()
+    for number in range(4):
+        stats.add(f"SELECT col{number}", (), 1.0, None, "default")
+    assert len(slow_query_records) == 3, (
+        "Убедитесь, что при переполнении сводки она пишется досрочно."
+    )
+    assert len(stats.offenders) == 1
+
+
+def test_fast_query_is_not_recorded(slow_query_records):
+    stats = SlowQueryStats()
+    with connection.execute_wrapper(SlowQueryRecorder(10_000, stats)):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    stats.flush()
+    assert not slow_query_records
+
+
+def test_command_prints_top_offenders(tmp_path):
+    def window(fingerprint, count, total_ms, max_ms, origins):
+        return json.dumps({
+            "fingerprint": fingerprint,
+            "sql": f"SELECT {fingerprint}",
+            "params": "()",
+            "count": count,
+            "total_ms": total_ms,
+            "max_ms": max_ms,
+            "origin": next(iter(origins)),
+            "origins": origins,
+        })
+
+    report = tmp_path / "slow.log"
+    (tmp_path / "slow.log.1").write_text(
+        window("rare", 1, 900, 900, {"api/views.py:10 in list": 1}) + "\n"
+    )
+    report.write_text("\n".join([
+        window("often", 3, 1200, 500, {
+            "blog/views.py:57 in index": 2,
+            "blog/views.py:90 in post_detail": 1,
+        }),
+        "не JSON",
+        window("often", 2, 250, 150, {"blog/views.py:57 in index": 2}),
+    ]) + "\n")
+
+    out = StringIO()
+    call_command("slow_queries", file=str(report), stdout=out)
+    output = out.getvalue()
+    assert output.index("often") < output.index("rare")
+    assert "5 раз" in output
+    assert "blog/views.py:57 in index (4)" in output
+
+    out = StringIO()
+    call_command(
+        "slow_queries", file=str(report), sort="max", limit=1, stdout=out
+    )
+    assert "rare" in out.getvalue() and "often" not in out.getvalue()
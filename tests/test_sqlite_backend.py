@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection, connections
+from django.db.utils import ConnectionHandler
+
+from blogicum.backends.sqlite3 import base as sqlite_base
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_pragma(conn, name):
+    with conn.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_pragmas_applied_on_connect():
+    assert connection.vendor == "sqlite"
+    assert get_pragma(connection, "synchronous") == 1, (
+        "Убедитесь, что бэкенд включает synchronous=NORMAL."
+    )
+    assert get_pragma(connection, "busy_timeout") == 5000
+    assert get_pragma(connection, "cache_size") == -64 * 1024
+
+
+def test_file_database_uses_wal_when_serving(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_base, "serving_requests", False)
+    handler = ConnectionHandler({
+        "default": {
+            "ENGINE": "blogicum.backends.sqlite3",
+            "NAME": tmp_path / "db.sqlite3",
+            "OPTIONS": {"pragmas": {"busy_timeout": 100}},
+        },
+    })
+    conn = handler["default"]
+    try:
+        assert get_pragma(conn, "journal_mode") == "delete", (
+            "Убедитесь, что вне HTTP-запросов (manage.py check и т. п.)"
+            " режим журнала файла базы не меняется."
+        )
+        assert get_pragma(conn, "busy_timeout") == 100, (
+            "Убедитесь, что PRAGMA можно переопределить через OPTIONS."
+        )
+        assert not (tmp_path / "db.sqlite3-wal").exists()
+
+        monkeypatch.setattr(sqlite_base, "serving_requests", True)
+        conn.apply_journal_mode()
+        assert get_pragma(conn, "journal_mode") == "wal", (
+            "Убедитесь, что при обслуживании запросов база"
+            " переходит в режим WAL."
+        )
+    finally:
+        conn.close()
+
+
+def test_connections_are_persistent():
+    assert connections.databases["default"]["CONN_MAX_AGE"] > 0, (
+        "Убедитесь, что соединения с базой переиспользуются между запросами."
+    )
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import re
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.images import process_batch
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.BLOG_IMAGE_WIDTHS = (320,)
+
+
+def make_png(color=(73, 109, 137)):
+    buffer = BytesIO()
+    Image.new("RGB", (400, 200), color=color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def blend_post(mixer: Mixer, user, content, name="meme.png"):
+    return mixer.blend(
+        "blog.Post", author=user, image=ImageFile(BytesIO(content), name=name)
+    )
+
+
+def stored_files(tmp_path):
+    return sorted(p for p in tmp_path.rglob("*") if p.is_file())
+
+
+def test_same_content_is_stored_once(mixer: Mixer, user, tmp_path):
+    content = make_png()
+    first = blend_post(mixer, user, content, "meme.png")
+    second = blend_post(mixer, user, content, "meme (1).PNG")
+
+    digest = hashlib.sha256(content).hexdigest()
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения хранятся одним файлом."
+    )
+    assert first.image.name == (
+        f"post_images/{digest[:2]}/{digest[2:4]}/{digest}.png"
+    )
+    assert len(stored_files(tmp_path)) == 1
+
+
+def test_upload_through_view_is_hashed(
+    settings, user_client, published_category
+):
+    # Файл больше лимита памяти попадёт во временный файл на диске.
+    settings.FILE_UPLOAD_MAX_MEMORY_SIZE = 100
+    response = user_client.post(
+        "/posts/create/",
+        data={
+            "title": "Заголовок",
+            "text": "Текст",
+            "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+            "category": published_category.id,
+            "is_published": True,
+            "image": SimpleUploadedFile(
+                "photo.png", make_png(), content_type="image/png"
+            ),
+        },
+    )
+    assert response.status_code == 302
+    assert re.fullmatch(
+        r"post_images/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.png",
+        Post.objects.get().image.name,
+    )
+
+
+def test_blob_is_swept_after_last_reference(mixer: Mixer, user, tmp_path):
+    content = make_png()
+    first = blend_post(mixer, user, content)
+    second = blend_post(mixer, user, content)
+    other = blend_post(mixer, user, make_png((0, 0, 0)))
+    process_batch()
+    second.refresh_from_db()
+    assert second.image_variants["webp"] == (
+        Post.objects.get(pk=first.pk).image_variants["webp"]
+    ), "Убедитесь, что копии одного файла делаются один раз."
+    # Оригинал и две копии на каждое из двух изображений.
+    assert len(stored_files(tmp_path)) == 6
+
+    first.delete()
+    call_command("sweep_images", grace=0, stdout=StringIO())
+    assert second.image.storage.exists(second.image.name), (
+        "Убедитесь, что файл, на который ссылается другой пост,"
+        " не удаляется."
+    )
+    assert len(stored_files(tmp_path)) == 6
+
+    second.delete()
+    assert len(stored_files(tmp_path)) == 6, (
+        "Убедитесь, что файл не удаляется вместе с постом: его могут"
+        " в этот момент загрузить заново."
+    )
+    call_command("sweep_images", stdout=StringIO())
+    assert len(stored_files(tmp_path)) == 6, (
+        "Убедитесь, что недавно записанные файлы не удаляются."
+    )
+    call_command("sweep_images", grace=0, stdout=StringIO())
+    assert len(stored_files(tmp_path)) == 3, (
+        "Убедитесь, что файл и его копии удаляются после последнего"
+        " поста, который на них ссылается."
+    )
+    assert other.image.storage.exists(other.image.name)
+
+
+def test_resave_refreshes_blob(mixer: Mixer, user, tmp_path):
+    content = make_png()
+    post = blend_post(mixer, user, content)
+    path = tmp_path / post.image.name
+    os.utime(path, (0, 0))
+    post.delete()
+
+    blend_post(mixer, user, content)
+    call_command("sweep_images", grace=60, stdout=StringIO())
+    assert path.exists(), (
+        "Убедитесь, что повторная загрузка того же файла защищает его"
+        " от удаления."
+    )
+    assert not list(tmp_path.rglob(".upload-*"))
@@ -0,0 +1,177 @@
+import os
+import struct
+import zlib
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopUpload
+from django.http import HttpRequest
+from django.test import Client
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from blog.models import Post
+from blog.uploads import ImageUploadLimitHandler, RejectedUpload
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+def make_png(size, noise=False):
+    image = Image.new("RGB", size, color=(73, 109, 137))
+    if noise:
+        pixels = os.urandom(size[0] * size[1] * 3)
+        image = Image.frombytes("RGB", size, pixels)
+    buffer = BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def make_png_header(width, height):
+    """Сигнатура, IHDR и начало IDAT — пикселей в файле почти нет."""
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    chunk = b"IHDR" + ihdr
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + struct.pack(">I", len(ihdr))
+        + chunk
+        + struct.pack(">I", zlib.crc32(chunk))
+        + struct.pack(">I", 16)
+        + b"IDAT"
+        + bytes(16)
+    )
+
+
+def create_post(client, category, content):
+    return client.post(
+        "/posts/create/",
+        data={
+            "title": "Заголовок",
+            "text": "Текст",
+            "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+            "category": category.id,
+            "is_published": True,
+            "image": SimpleUploadedFile(
+                "image.png", content, content_type="image/png"
+            ),
+        },
+    )
+
+
+def run_handler(chunks, field_name="image"):
+    handler = ImageUploadLimitHandler(HttpRequest())
+    handler.new_file(field_name, "image.png", "image/png", None)
+    passed = [handler.receive_data_chunk(chunk, 0) for chunk in chunks]
+    return passed, handler.file_complete(sum(map(len, chunks)))
+
+
+def test_image_within_limits_is_saved(user_client, published_category):
+    response = create_post(
+        user_client, published_category, make_png((50, 50))
+    )
+    assert response.status_code == 302
+    assert Post.objects.get().image
+
+
+def test_oversize_pixels_are_rejected_by_form(
+    settings, user_client, published_category
+):
+    settings.BLOG_IMAGE_MAX_PIXELS = 50 * 50
+    response = create_post(
+        user_client, published_category, make_png((60, 60), noise=True)
+    )
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что слишком большое изображение не принимается"
+        " формой публикации."
+    )
+    assert not Post.objects.exists()
+
+
+def test_oversize_file_stops_upload(
+    settings, user_client, published_category
+):
+    settings.BLOG_IMAGE_MAX_BYTES = 2000
+    response = create_post(
+        user_client, published_category, make_png((100, 100), noise=True)
+    )
+    assert response.status_code == 413, (
+        "Убедитесь, что слишком тяжёлый файл прерывает загрузку."
+    )
+    assert not Post.objects.exists()
+
+
+def test_handler_stops_upload_after_byte_limit(settings):
+    settings.BLOG_IMAGE_MAX_BYTES = 100 * 1024
+    content = make_png((300, 300), noise=True)
+    chunks = [content[i:i + 65536] for i in range(0, len(content), 65536)]
+
+    with pytest.raises(StopUpload) as error:
+        run_handler(chunks)
+    assert error.value.connection_reset, (
+        "Убедитесь, что после превышения лимита остаток запроса"
+        " не читается."
+    )
+
+
+def test_handler_ignores_other_fields(settings):
+    settings.BLOG_IMAGE_MAX_BYTES = 1024
+    chunks = [b"x" * 2048, b"y" * 2048]
+    passed, result = run_handler(chunks, field_name="attachment")
+    assert passed == chunks and result is None, (
+        "Убедитесь, что лимиты изображений не трогают другие файлы."
+    )
+
+
+def test_handler_checks_pixels_by_header_only(settings):
+    settings.BLOG_IMAGE_MAX_PIXELS = 1000 * 1000
+    passed, result = run_handler([make_png_header(5000, 5000)])
+    assert passed == [None]
+    assert isinstance(result, RejectedUpload)
+    assert "пикселей" in result.error
+
+    passed, result = run_handler([make_png_header(500, 500)])
+    assert passed != [None] and result is None
+
+
+def test_handler_rejects_non_image(settings):
+    settings.BLOG_IMAGE_PROBE_BYTES = 1024
+    passed, result = run_handler([b"x" * 2048, b"y" * 2048])
+    assert passed == [None, None]
+    assert isinstance(result, RejectedUpload)
+
+
+def test_api_rejects_oversize_image(settings, user, published_category):
+    settings.BLOG_IMAGE_MAX_BYTES = 2000
+    client = APIClient()
+    client.force_authenticate(user)
+    response = client.post(
+        "/api/v1/posts/",
+        {
+            "title": "Заголовок",
+            "text": "Текст",
+            "pub_date": timezone.now().isoformat(),
+            "category": published_category.id,
+            "image": SimpleUploadedFile(
+                "image.png", make_png((100, 100), noise=True),
+                content_type="image/png",
+            ),
+        },
+        format="multipart",
+    )
+    assert response.status_code == 413
+
+
+def test_upload_views_keep_csrf_check(user):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    response = client.post("/posts/create/", {"title": "Заголовок"})
+    assert response.status_code == 403, (
+        "Убедитесь, что лимиты загрузок не отключают проверку CSRF."
+    )